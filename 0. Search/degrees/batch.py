@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+import re
+import sys
+
+import degrees
+from cache import PathCache
+
+# Each worker process memoizes the queries it answers in its own copy of this cache
+cache = PathCache()
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python batch.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    queries = sys.argv[2] if len(sys.argv) == 3 else "-"
+
+    # Load data once; forked workers share it copy-on-write
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    f = sys.stdin if queries == "-" else open(queries, encoding="utf-8")
+    try:
+        for answer in answer_all(f):
+            print(json.dumps(answer), flush=True)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def answer_all(lines, processes=None):
+    """
+    Yields one answer dict per non-blank query line, in input order,
+    fanning the queries out across a pool of processes.
+    """
+    queries = (line for line in lines if line.strip())
+    if "fork" not in multiprocessing.get_all_start_methods():
+        # Without fork every worker would have to reload the data, so answer in this process instead
+        yield from map(answer_query, queries)
+        return
+
+    context = multiprocessing.get_context("fork")
+    with context.Pool(processes or os.cpu_count()) as pool:
+        yield from pool.imap(answer_query, queries, chunksize=16)
+
+
+def answer_query(line):
+    """
+    Answers a single query line, which is either a JSON object with
+    "source" and "target" keys or two names separated by a tab.
+    """
+    try:
+        source, target = parse_query(line)
+    except ValueError as error:
+        return {"query": line.strip(), "error": str(error)}
+
+    answer = {"source": source, "target": target}
+    try:
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+    except LookupError as error:
+        answer["error"] = str(error)
+        return answer
+
+    path = cache.shortest_path(source_id, target_id)
+    if path is None:
+        answer["degrees"] = None
+        answer["path"] = None
+    else:
+        answer["degrees"] = len(path)
+        answer["path"] = [
+            {"movie_id": movie_id, "person_id": person_id}
+            for movie_id, person_id in path
+        ]
+    return answer
+
+
+def parse_query(line):
+    """
+    Returns the (source, target) pair of names in a query line.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            query = json.loads(line)
+            return str(query["source"]), str(query["target"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise ValueError("expected a JSON object with source and target")
+
+    fields = line.split("\t")
+    if len(fields) != 2:
+        raise ValueError("expected two tab-separated names")
+    return fields[0].strip(), fields[1].strip()
+
+
+def resolve_person(name):
+    """
+    Returns the person_id for a person_id or a name, optionally followed by
+    a birth year in parentheses (e.g. "Kevin Bacon (1958)"), without prompting.
+
+    Raises LookupError if no person, or more than one, matches.
+    """
+    if name in degrees.people:
+        return name
+
+    match = re.fullmatch(r"(.*?)\s*\((\d{4})\)", name)
+    if match:
+        return degrees.name_index.resolve(match.group(1), birth=match.group(2))
+    return degrees.name_index.resolve(name)
+
+
+if __name__ == "__main__":
+    main()
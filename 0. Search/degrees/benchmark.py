@@ -0,0 +1,177 @@
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import time
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees search.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="write synthetic CSVs")
+    generate_parser.add_argument("directory")
+    generate_parser.add_argument("edges", type=int, help="number of rows in stars.csv")
+    generate_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="time load_data and shortest_path")
+    run_parser.add_argument("directory")
+    run_parser.add_argument("--queries", type=int, default=200)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--bidirectional", action="store_true")
+    run_parser.add_argument("--output", default="benchmark.json",
+                            help="file the results are appended to as one JSON line")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args.directory, args.edges, args.seed)
+    else:
+        results = run(args.directory, args.queries, args.seed, args.bidirectional)
+        print(json.dumps(results, indent=4))
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(results) + "\n")
+
+
+def generate(directory, edges, seed=0):
+    """
+    Writes synthetic people.csv, movies.csv and stars.csv files with about
+    edges rows in stars.csv to directory.
+
+    Cast sizes follow a power law (most movies have a handful of stars, a
+    few have very large casts), and so does how often each person is cast.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    # Draw cast sizes until they account for every edge
+    cast_sizes = []
+    total = 0
+    while total < edges:
+        size = min(int(rng.paretovariate(1.5)) + 1, 500, edges - total)
+        cast_sizes.append(size)
+        total += size
+    person_count = max(2, edges // 3)
+
+    # Rank-based (Zipf) popularity for choosing who gets cast
+    cumulative = []
+    running = 0.0
+    for rank in range(1, person_count + 1):
+        running += 1 / rank ** 0.8
+        cumulative.append(running)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person_id in range(person_count):
+            writer.writerow([person_id, f"Person {person_id}", rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie_id in range(len(cast_sizes)):
+            writer.writerow([movie_id, f"Movie {movie_id}", rng.randint(1920, 2020)])
+
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id, size in enumerate(cast_sizes):
+            cast = rng.choices(range(person_count), cum_weights=cumulative, k=size)
+            for person_id in set(cast):
+                writer.writerow([person_id, movie_id])
+
+
+def run(directory, queries, seed=0, bidirectional=False):
+    """
+    Loads directory and answers a seeded workload of random queries,
+    returning a dict of load time, query latency percentiles, nodes
+    expanded and peak memory.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, snapshot=False)
+    load_seconds = time.perf_counter() - start
+
+    # Only people who starred in something can be connected to anybody, so queries are between them
+    rng = random.Random(seed)
+    person_ids = sorted(person_id for person_id, person in degrees.people.items() if person["movies"])
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(queries)]
+
+    # Count expansions by wrapping the function shortest_path calls for each one
+    expanded = 0
+    neighbors_for_person = degrees.neighbors_for_person
+
+    def counting_neighbors(person_id):
+        nonlocal expanded
+        expanded += 1
+        return neighbors_for_person(person_id)
+
+    latencies = []
+    unconnected_latencies = [] # Those of the latencies for queries with no path
+    nodes = []
+    connected = 0
+    degrees.neighbors_for_person = counting_neighbors
+    try:
+        for source, target in pairs:
+            expanded = 0
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target, bidirectional=bidirectional)
+            latencies.append(time.perf_counter() - start)
+            nodes.append(expanded)
+            if path is None:
+                unconnected_latencies.append(latencies[-1])
+            else:
+                connected += 1
+    finally:
+        degrees.neighbors_for_person = neighbors_for_person
+
+    return {
+        "commit": current_commit(),
+        "directory": directory,
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "edges": sum(len(person["movies"]) for person in degrees.people.values()),
+        "bidirectional": bidirectional,
+        "queries": queries,
+        "seed": seed,
+        "connected": connected,
+        "load_seconds": load_seconds,
+        "load_stats": degrees.load_stats,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "unconnected_latency_p50": percentile(unconnected_latencies, 50),
+        "unconnected_latency_p99": percentile(unconnected_latencies, 99),
+        "nodes_expanded_mean": sum(nodes) / len(nodes) if nodes else None,
+        "nodes_expanded_p99": percentile(nodes, 99),
+        "peak_memory": degrees.peak_memory()
+    }
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values (nearest rank), or None if empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100)) # Ceiling of len * p / 100
+    return ordered[int(rank) - 1]
+
+
+def current_commit():
+    """
+    Returns the git commit being benchmarked, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    main()
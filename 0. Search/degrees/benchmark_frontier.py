@@ -0,0 +1,46 @@
+import random
+import sys
+import time
+
+import degrees
+from util import QueueFrontier, DequeQueueFrontier
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark_frontier.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    queries = int(sys.argv[2]) if len(sys.argv) == 3 else 20
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    # Use the same seeded set of queries for every frontier
+    random.seed(0)
+    person_ids = sorted(degrees.people)
+    pairs = [tuple(random.sample(person_ids, 2)) for _ in range(queries)]
+
+    timings = {}
+    for frontier in (QueueFrontier, DequeQueueFrontier):
+        timings[frontier.__name__] = time_queries(frontier, pairs)
+
+    baseline = timings[QueueFrontier.__name__]
+    for name, elapsed in timings.items():
+        print(f"{name}: {elapsed:.3f}s for {queries} queries "
+              f"({baseline / elapsed:.1f}x)")
+
+
+def time_queries(frontier, pairs):
+    """
+    Returns the seconds taken to answer every (source, target) pair
+    with shortest_path using the given frontier class.
+    """
+    start = time.perf_counter()
+    for source, target in pairs:
+        degrees.shortest_path(source, target, frontier_class=frontier)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+import degrees
+
+
+class PathCache():
+    """
+    Bounded LRU memoization layer around degrees.shortest_path.
+
+    Paths are keyed on the unordered pair of people, so a query in the
+    opposite direction is answered by reversing the cached path. People who
+    keep showing up in queries also get their whole breadth-first search
+    tree (see degrees.all_distances) cached, which answers any query
+    involving them without searching.
+
+    Memory is bounded by max_paths cached paths and by max_tree_entries
+    people across all cached trees, evicting least recently used first.
+    """
+
+    def __init__(self, max_paths=100000, max_tree_entries=1000000, hot_threshold=3):
+        self.max_paths = max_paths
+        self.max_tree_entries = max_tree_entries
+        self.hot_threshold = hot_threshold
+
+        # Maps (person_id, person_id) pairs, in sorted order, to the path from the first to the second
+        self.paths = OrderedDict()
+
+        # Maps source person_ids to their search trees
+        self.trees = OrderedDict()
+        self.tree_entries = 0
+
+        # Maps person_ids to how many recent queries they were part of
+        self.uses = OrderedDict()
+
+        # person_ids whose trees turned out too big to cache, so they aren't searched again
+        self.oversized = set()
+
+        self.hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def shortest_path(self, source, target):
+        """
+        Returns a shortest path from source to target, or None, as
+        degrees.shortest_path(source, target) does, from the cache when
+        possible. Where there are several shortest paths, the one returned
+        may differ.
+        """
+        if source == target:
+            return None
+
+        key = (source, target) if source <= target else (target, source)
+
+        if key in self.paths:
+            self.hits += 1
+            self.paths.move_to_end(key)
+            path = self.paths[key]
+            return path if key[0] == source else reverse_path(key[0], path)
+
+        found, path = self.path_from_trees(source, target)
+        if found:
+            self.tree_hits += 1
+        else:
+            self.misses += 1
+            path = degrees.shortest_path(source, target, bidirectional=True)
+            self.count_use(source)
+            self.count_use(target)
+
+        self.paths[key] = path if key[0] == source else reverse_path(source, path)
+        if len(self.paths) > self.max_paths:
+            self.paths.popitem(last=False)
+            self.evictions += 1
+        return path
+
+    def path_from_trees(self, source, target):
+        """
+        Looks the path from source to target up in a cached search tree
+        rooted at either of them.
+
+        Returns a (found, path) pair; found is False if neither has a tree.
+        """
+        if source in self.trees:
+            self.trees.move_to_end(source)
+            return True, degrees.path_from_tree(self.trees[source], target)
+        if target in self.trees:
+            self.trees.move_to_end(target)
+            path = degrees.path_from_tree(self.trees[target], source)
+            return True, reverse_path(target, path)
+        return False, None
+
+    def count_use(self, person_id):
+        """
+        Records that person_id was part of a missed query, caching their
+        search tree once they reach hot_threshold uses.
+        """
+        self.uses[person_id] = self.uses.get(person_id, 0) + 1
+        self.uses.move_to_end(person_id)
+        if len(self.uses) > self.max_paths:
+            self.uses.popitem(last=False)
+
+        if (self.uses[person_id] >= self.hot_threshold and person_id not in self.trees
+                and person_id not in self.oversized):
+            tree, _ = degrees.all_distances(person_id)
+            if len(tree) > self.max_tree_entries:
+                self.oversized.add(person_id)
+                return
+            self.trees[person_id] = tree
+            self.tree_entries += len(tree)
+            while self.tree_entries > self.max_tree_entries:
+                _, evicted = self.trees.popitem(last=False)
+                self.tree_entries -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Returns a dict of cache counters.
+        """
+        return {
+            "hits": self.hits,
+            "tree_hits": self.tree_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "paths": len(self.paths),
+            "trees": len(self.trees),
+            "tree_entries": self.tree_entries,
+        }
+
+    def clear(self):
+        """
+        Empties the cache, e.g. after loading a different dataset.
+        """
+        self.paths.clear()
+        self.trees.clear()
+        self.uses.clear()
+        self.oversized.clear()
+        self.tree_entries = 0
+
+
+def reverse_path(source, path):
+    """
+    Given the (movie_id, person_id) path from source to some target, returns
+    the path from that target back to source.
+    """
+    if path is None:
+        return path
+
+    people = [source] + [person_id for _, person_id in path]
+    people.reverse()
+    movie_ids = [movie_id for movie_id, _ in reversed(path)]
+    return list(zip(movie_ids, people[1:]))
@@ -1,7 +1,19 @@
 import csv
+import hashlib
+import os
+import pickle
 import sys
+import time
+import tracemalloc
+from operator import itemgetter
 
-from util import Node, StackFrontier, QueueFrontier
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+from nameindex import NameIndex
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,44 +24,263 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Prefix and fuzzy lookups over names, rebuilt by load_data
+name_index = NameIndex(names, people)
+
+# Bump whenever the layout of names, people or movies changes, so that old snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = ".degrees.snapshot"
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+CSV_BUFFER_SIZE = 1 << 20
+
+# Maps each CSV file to statistics from the last time it was parsed:
+# rows, malformed rows, seconds, rows_per_second, peak_memory (bytes; see FileStats)
+# and process_peak_memory (bytes)
+load_stats = {}
+
 
-def load_data(directory):
+def load_data(directory, snapshot=True):
     """
     Load data from CSV files into memory.
+
+    If snapshot is True, the parsed data is loaded from a binary snapshot
+    in directory when one exists for the current CSV files, and a new
+    snapshot is written after parsing otherwise.
     """
+    global name_index
+
+    if not (snapshot and load_snapshot(directory)):
+        parse_csv_files(directory)
+        if snapshot:
+            save_snapshot(directory)
+
+    name_index = NameIndex(names, people)
+
+
+def parse_csv_files(directory):
+    """
+    Parse the people, movies and stars CSV files into memory,
+    recording per-file statistics in load_stats.
+    """
+    load_stats.clear()
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
+    with FileStats("people.csv") as stats:
+        for person_id, name, birth in read_csv(directory, stats, "id", "name", "birth"):
+            person_id = sys.intern(person_id)
+            people[person_id] = {
+                "name": name,
+                "birth": sys.intern(birth),
                 "movies": set()
             }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+            key = name.lower()
+            if key not in names:
+                names[key] = {person_id}
             else:
-                names[row["name"].lower()].add(row["id"])
+                names[key].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
+    with FileStats("movies.csv") as stats:
+        for movie_id, title, year in read_csv(directory, stats, "id", "title", "year"):
+            movies[sys.intern(movie_id)] = {
+                "title": title,
+                "year": sys.intern(year),
                 "stars": set()
             }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    with FileStats("stars.csv") as stats:
+        for person_id, movie_id in read_csv(directory, stats, "person_id", "movie_id"):
+            # Use the interned ids from people and movies rather than new copies
+            person = people.get(person_id)
+            movie = movies.get(movie_id)
+            if person is None or movie is None:
+                stats.malformed += 1
+                continue
+            person["movies"].add(sys.intern(movie_id))
+            movie["stars"].add(sys.intern(person_id))
+
+
+def read_csv(directory, stats, *columns):
+    """
+    Yields the values of the given columns for each row of a CSV file,
+    reading it in large buffered chunks.
+
+    Rows that are missing one of the columns are counted as malformed
+    in stats and skipped.
+    """
+    with open(f"{directory}/{stats.filename}", encoding="utf-8",
+              newline="", buffering=CSV_BUFFER_SIZE) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            positions = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{stats.filename} must have columns {', '.join(columns)}")
+        values = itemgetter(*positions)
+
+        rows = 0
+        try:
+            for row in reader:
+                rows += 1
+                try:
+                    yield values(row)
+                except IndexError:
+                    if row:
+                        stats.malformed += 1
+                    else: # Blank line
+                        rows -= 1
+        finally:
+            stats.rows = rows
+
+
+class FileStats():
+    """
+    Context manager that times the parsing of one CSV file and records
+    its row counts, throughput and memory use in load_stats.
+
+    peak_memory is the most memory allocated at any point while parsing
+    the file, beyond what was allocated before it. Measuring it needs
+    tracemalloc, which slows parsing down several times, so it is only
+    recorded when tracemalloc is already tracing (e.g. python -X tracemalloc)
+    and is None otherwise. process_peak_memory is the high-water mark of
+    the whole process once the file is parsed (see peak_memory()).
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.rows = 0
+        self.malformed = 0
+        self.start_memory = None
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        file_peak = None
+        if tracemalloc.is_tracing() and self.start_memory is not None:
+            file_peak = tracemalloc.get_traced_memory()[1] - self.start_memory
+        load_stats[self.filename] = {
+            "rows": self.rows,
+            "malformed": self.malformed,
+            "seconds": seconds,
+            "rows_per_second": self.rows / seconds if seconds else None,
+            "peak_memory": file_peak,
+            "process_peak_memory": peak_memory()
+        }
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process so far in bytes,
+    or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reports kilobytes
+
+
+def csv_fingerprints(directory, previous=None):
+    """
+    Returns a dict mapping each CSV file to its (size, mtime, sha256).
+
+    Hashing is skipped for a file whose size and mtime match previous,
+    so an unchanged dataset is only stat'ed.
+    """
+    fingerprints = {}
+    for filename in CSV_FILES:
+        path = os.path.join(directory, filename)
+        stat = os.stat(path)
+        old = (previous or {}).get(filename)
+        if old is not None and old[:2] == (stat.st_size, stat.st_mtime_ns):
+            fingerprints[filename] = old
+            continue
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprints[filename] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return fingerprints
+
+
+def load_snapshot(directory):
+    """
+    Loads names, people and movies from the snapshot in directory.
+
+    Returns False, leaving the data untouched, if there is no snapshot
+    or it was written by another version or for different CSV files.
+
+    The snapshot is a pickle, and unpickling a file can run arbitrary
+    code, so only load snapshots from a directory you trust. As a guard,
+    a snapshot that belongs to another user or that other users can
+    write to is ignored (and rebuilt).
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    try:
+        if not trusted(path):
+            return False
+        with open(path, "rb") as f:
+            version, fingerprints = pickle.load(f)
+            if version != SNAPSHOT_VERSION:
+                return False
+
+            # Compare contents rather than mtimes alone, so a touched but unchanged file keeps its snapshot
+            current = csv_fingerprints(directory, fingerprints)
+            if any(current[filename][::2] != fingerprints[filename][::2] for filename in CSV_FILES):
+                return False
+
+            snapshot_names, snapshot_people, snapshot_movies = pickle.load(f)
+    except (OSError, EOFError, KeyError, TypeError, ValueError, pickle.UnpicklingError):
+        return False
+
+    names.update(snapshot_names)
+    people.update(snapshot_people)
+    movies.update(snapshot_movies)
+
+    # A file was touched but not changed: record its new mtime, so later starts don't hash it again
+    if current != fingerprints:
+        save_snapshot(directory, current)
+    return True
+
+
+def trusted(path):
+    """
+    Returns True if the file at path belongs to this user and nobody else can write to it
+    (always True where the platform has no user ids).
+    """
+    stat = os.stat(path)
+    if not hasattr(os, "getuid"):
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def save_snapshot(directory, fingerprints=None):
+    """
+    Writes names, people and movies to a snapshot in directory,
+    tagged with the fingerprints of the CSV files they came from
+    (computed afresh unless given).
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    try:
+        # Write to a temporary file first so a reader never sees a partial snapshot.
+        # Only this user may write to it, whatever the umask, or load_snapshot won't trust it
+        fd = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o600) # In case a leftover temporary file had other permissions
+        with os.fdopen(fd, "wb") as f:
+            header = (SNAPSHOT_VERSION, fingerprints or csv_fingerprints(directory))
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((names, people, movies), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass # A read-only dataset just goes without a snapshot
 
 
 def main():
@@ -61,6 +292,9 @@ def main():
     print("Loading data...")
     load_data(directory)
     print("Data loaded.")
+    for filename, stats in load_stats.items():
+        print(f"  {filename}: {stats['rows']} rows ({stats['malformed']} malformed) "
+              f"in {stats['seconds']:.2f}s")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -70,7 +304,14 @@ def main():
         sys.exit("Person not found.")
 
     path = shortest_path(source, target)
+    print_path(source, path, people, movies)
+
 
+def print_path(source, path, people, movies):
+    """
+    Prints a path from source as found by shortest_path, looking names and
+    titles up in people and movies (laid out like the module-level dicts).
+    """
     if path is None:
         print("Not connected.")
     else:
@@ -84,17 +325,24 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, frontier_class=DequeQueueFrontier):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If bidirectional is True, searches from both ends at once
+    (see bidirectional_shortest_path). Otherwise the breadth-first
+    search keeps its frontier in a new frontier_class, which must
+    behave as a queue.
     """
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
 
     # Start with frontier with initial state (the first person)
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(start)
 
     explored = set() # Start with empty explored set
@@ -124,12 +372,139 @@ def shortest_path(source, target):
     return None # If frontier is empty, then return None
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one breadth-first
+    frontier from each end and always expanding the smaller one.
+
+    If no possible path, returns None. Like shortest_path, that includes
+    a path from a person to themselves.
+    """
+    if source == target:
+        return None
+
+    # Maps each reached person to their distance and to the (movie_id, person_id)
+    # step that leads back towards the side the search started from
+    forward = {source: (0, None)}
+    backward = {target: (0, None)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Expand a whole level of the smaller frontier, so every path found in this level is as short as possible
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, visited, other = forward_frontier, forward, backward
+        else:
+            frontier, visited, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        meeting = None # (total length, person_id where the two searches meet)
+        for person_id in frontier:
+            distance = visited[person_id][0] + 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in visited:
+                    continue
+                visited[neighbor] = (distance, (movie_id, person_id))
+                next_frontier.append(neighbor)
+                if neighbor in other:
+                    length = distance + other[neighbor][0]
+                    if meeting is None or length < meeting[0]:
+                        meeting = (length, neighbor)
+
+        if meeting is not None:
+            return join_paths(forward, backward, meeting[1])
+
+        if visited is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None # If either frontier is empty, the two people are not connected
+
+
+def join_paths(forward, backward, middle):
+    """
+    Stitches the forward search tree (rooted at the source) and the backward
+    search tree (rooted at the target) together at the person middle,
+    returning the (movie_id, person_id) path from source to target.
+    """
+    path = path_from_tree(forward, middle) # From the source to the meeting point
+
+    # Walk on from the meeting point to the target
+    person_id = middle
+    while backward[person_id][1] is not None:
+        movie_id, child = backward[person_id][1]
+        path.append((movie_id, child))
+        person_id = child
+
+    return path
+
+
+def all_distances(source):
+    """
+    Runs a single breadth-first search from source over every reachable person.
+
+    Returns a (tree, histogram) pair: tree maps each reachable person_id to
+    (distance, step), where step is the (movie_id, person_id) pair leading
+    back towards source (None for source itself), and histogram maps each
+    degree of separation to the number of people at that distance.
+    """
+    tree = {source: (0, None)}
+    histogram = {0: 1}
+    frontier = [source]
+    distance = 0
+
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in tree:
+                    tree[neighbor] = (distance, (movie_id, person_id))
+                    next_frontier.append(neighbor)
+        if next_frontier:
+            histogram[distance] = len(next_frontier)
+        frontier = next_frontier
+
+    return tree, histogram
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the list of (movie_id, person_id) pairs from the root of a search
+    tree (as built by all_distances) to target.
+
+    If target is not in the tree, returns None.
+    """
+    if target not in tree:
+        return None
+
+    path = []
+    person_id = target
+    while tree[person_id][1] is not None:
+        movie_id, parent = tree[person_id][1]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
     person_ids = list(names.get(name.lower(), set()))
+    return choose_person_id(name, person_ids, people)
+
+
+def choose_person_id(name, person_ids, people):
+    """
+    Returns the one of person_ids, the IMDB ids of the people with a name,
+    that the user meant, asking which if there are several. people maps
+    each of them to a dict with their name and birth.
+    """
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -0,0 +1,259 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate, repeat
+
+import degrees
+from degrees import FileStats, read_csv
+
+
+class CompactGraph():
+    """
+    Integer-indexed representation of the degrees data.
+
+    Person and movie IDs are interned to dense integers (their positions
+    in the sorted person_ids and movie_ids lists of IMDb id strings), and
+    the bipartite person -> movie and movie -> person edges are stored in
+    compressed sparse row (CSR) form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and likewise
+    for the stars of a movie.
+
+    Only the ids and edges are kept in memory. Names, births, titles and
+    years are read from the CSV files when they are needed (see people_named
+    and display_data), which scan the files again.
+    """
+
+    def __init__(self):
+        self.directory = None
+
+        # Index -> IMDb id, sorted so ids can be found by binary search without an index dict
+        self.person_ids = []
+        self.movie_ids = []
+
+        # CSR adjacency
+        self.person_offsets = array("q", [0])
+        self.person_movies = array("q")
+        self.movie_offsets = array("q", [0])
+        self.movie_people = array("q")
+
+    def load(self, directory):
+        """
+        Load the ids and edges from the CSV files into the compact
+        representation, recording per-file statistics in degrees.load_stats.
+        """
+        self.directory = directory
+        degrees.load_stats.clear()
+
+        with FileStats("people.csv") as stats:
+            self.person_ids = sorted(set(read_csv(directory, stats, "id")))
+        with FileStats("movies.csv") as stats:
+            self.movie_ids = sorted(set(read_csv(directory, stats, "id")))
+
+        # IMDb id -> index, only while loading the stars
+        person_index = {person_id: index for index, person_id in enumerate(self.person_ids)}
+        movie_index = {movie_id: index for index, movie_id in enumerate(self.movie_ids)}
+
+        # Load stars as a flat list of (person, movie) edges
+        # (a repeated row only adds a duplicate edge, which the search skips)
+        edge_people = array("q")
+        edge_movies = array("q")
+        with FileStats("stars.csv") as stats:
+            for person_id, movie_id in read_csv(directory, stats, "person_id", "movie_id"):
+                person = person_index.get(person_id)
+                movie = movie_index.get(movie_id)
+                if person is None or movie is None:
+                    stats.malformed += 1
+                    continue
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        self.person_offsets, self.person_movies = build_csr(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_people = build_csr(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+
+    def person_index(self, person_id):
+        """
+        Returns the index of the person with the given IMDb id, or None.
+        """
+        return find(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of the movie with the given IMDb id, or None.
+        """
+        return find(self.movie_ids, movie_id)
+
+    def people_named(self, name):
+        """
+        Returns a dict mapping the IMDb id of each person with the given
+        name (ignoring case) to a dict of their name and birth.
+        """
+        name = name.lower()
+        found = {}
+        people = read_csv(self.directory, FileStats("people.csv"), "id", "name", "birth")
+        for person_id, person_name, birth in people:
+            if person_name.lower() == name:
+                found[person_id] = {"name": person_name, "birth": birth}
+        return found
+
+    def display_data(self, person_ids, movie_ids):
+        """
+        Returns (people, movies) dicts mapping the given IMDb ids to dicts
+        with a person's name and birth, or a movie's title and year.
+        """
+        person_ids = set(person_ids)
+        movie_ids = set(movie_ids)
+        people = {}
+        movies = {}
+        for person_id, name, birth in read_csv(self.directory, FileStats("people.csv"), "id", "name", "birth"):
+            if person_id in person_ids:
+                people[person_id] = {"name": name, "birth": birth}
+        for movie_id, title, year in read_csv(self.directory, FileStats("movies.csv"), "id", "title", "year"):
+            if movie_id in movie_ids:
+                movies[movie_id] = {"title": title, "year": year}
+        return people, movies
+
+    def neighbors_for_person(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+        for m in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[m]
+            for p in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[p]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, given their IMDb ids.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index(source)
+        target = self.person_index(target)
+        if source is None or target is None or source == target:
+            return None
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+
+        # Breadth-first search over indices; parents double as the explored set
+        parent = array("q", [-1]) * len(self.person_ids)
+        parent_movie = array("q", [-1]) * len(self.person_ids)
+        movie_seen = bytearray(len(self.movie_ids))
+        parent[source] = source
+        frontier = array("q", [source])
+        while frontier:
+            next_frontier = array("q")
+            for person in frontier:
+                for m in range(person_offsets[person], person_offsets[person + 1]):
+                    movie = person_movies[m]
+                    # Every star of a movie is reached on the first visit to it
+                    if movie_seen[movie]:
+                        continue
+                    movie_seen[movie] = 1
+                    for p in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                        neighbor = movie_people[p]
+                        if parent[neighbor] != -1:
+                            continue
+                        parent[neighbor] = person
+                        parent_movie[neighbor] = movie
+                        if neighbor == target:
+                            return self.path_to(target, parent, parent_movie)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        return None
+
+    def path_to(self, target, parent, parent_movie):
+        """
+        Follows the parent arrays back from target, returning the path
+        as (movie_id, person_id) pairs of IMDb ids.
+        """
+        path = []
+        person = target
+        while parent[person] != person:
+            path.append((self.movie_ids[parent_movie[person]], self.person_ids[person]))
+            person = parent[person]
+        path.reverse()
+        return path
+
+
+def find(ids, imdb_id):
+    """
+    Returns the position of an IMDb id in a sorted list of ids, or None
+    if it isn't there.
+    """
+    index = bisect_left(ids, imdb_id)
+    if index < len(ids) and ids[index] == imdb_id:
+        return index
+    return None
+
+
+def build_csr(rows, sources, targets):
+    """
+    Builds CSR (offsets, indices) arrays for rows nodes
+    from parallel arrays of edge sources and targets.
+    """
+    # A stable sort of the edges by source keeps each row's targets in file order
+    order = sorted(range(len(sources)), key=sources.__getitem__)
+    indices = array("q", map(targets.__getitem__, order))
+
+    counts = Counter(sources)
+    offsets = array("q", accumulate(map(counts.get, range(rows), repeat(0)), initial=0))
+    return offsets, indices
+
+
+def load_graph(directory):
+    """
+    Returns a CompactGraph loaded from the CSV files in directory.
+    """
+    graph = CompactGraph()
+    graph.load(directory)
+    return graph
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python graph.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    # Load data from files into memory
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+
+    source = person_id_for_name(graph, input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = person_id_for_name(graph, input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    path = graph.shortest_path(source, target)
+
+    people, movies = graph.display_data(
+        [source] + [person_id for _, person_id in path or []],
+        [movie_id for movie_id, _ in path or []]
+    )
+    degrees.print_path(source, path, people, movies)
+
+
+def person_id_for_name(graph, name):
+    """
+    Returns the IMDB id for a person's name,
+    resolving ambiguities as needed.
+    """
+    people = graph.people_named(name)
+    return degrees.choose_person_id(name, list(people), people)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from bisect import bisect_left
+
+# Sorts after every character that can appear in a name, so prefix + END bounds all names with that prefix
+END = "\U0010ffff"
+
+
+class NameIndex():
+    """
+    Index over the lowercase names in degrees.names, supporting exact,
+    prefix and bounded edit-distance lookups without prompting.
+
+    Names are kept in one sorted list. Every prefix corresponds to a
+    contiguous range of that list, so the list doubles as an implicit trie
+    for fuzzy matching.
+    """
+
+    def __init__(self, names, people):
+        self.names = names
+        self.people = people
+        self.sorted_names = sorted(names)
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to limit names starting with prefix, in sorted order.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.sorted_names, prefix)
+        end = bisect_left(self.sorted_names, prefix + END, start)
+        return self.sorted_names[start:min(end, start + limit)]
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit (distance, name) pairs for names within
+        max_distance edits (insertions, deletions or substitutions) of name,
+        closest first.
+
+        The work grows quickly with max_distance, since every prefix within
+        max_distance edits of name has to be visited.
+        """
+        name = name.lower()
+        matches = []
+
+        def walk(prefix, lo, hi, row):
+            """
+            Visits the names in sorted_names[lo:hi], which all start with
+            prefix; row holds the edit distances from prefix to each
+            prefix of name.
+            """
+            depth = len(prefix)
+            i = lo
+            while i < hi:
+                candidate = self.sorted_names[i]
+                if len(candidate) == depth: # prefix is itself a name
+                    if row[-1] <= max_distance:
+                        matches.append((row[-1], candidate))
+                    i += 1
+                    continue
+
+                # Extend the prefix by one character, covering every name that shares it
+                child = prefix + candidate[depth]
+                j = bisect_left(self.sorted_names, child + END, i, hi)
+                next_row = [row[0] + 1]
+                for k in range(1, len(name) + 1):
+                    next_row.append(min(
+                        next_row[k - 1] + 1,
+                        row[k] + 1,
+                        row[k - 1] + (name[k - 1] != candidate[depth])
+                    ))
+
+                # No extension can get closer than the best entry in the row
+                if min(next_row) <= max_distance:
+                    walk(child, i, j, next_row)
+                i = j
+
+        walk("", 0, len(self.sorted_names), list(range(len(name) + 1)))
+        matches.sort()
+        return matches[:limit]
+
+    def person_ids(self, name, birth=None):
+        """
+        Returns the sorted person_ids with exactly this name, restricted to
+        those born in birth if it is given.
+        """
+        person_ids = self.names.get(name.lower(), set())
+        if birth is not None:
+            person_ids = {
+                person_id for person_id in person_ids
+                if self.people[person_id]["birth"] == str(birth)
+            }
+        return sorted(person_ids)
+
+    def resolve(self, name, birth=None):
+        """
+        Returns the single person_id for a name, disambiguating by birth
+        year if given.
+
+        Raises LookupError if no person, or more than one, matches.
+        """
+        person_ids = self.person_ids(name, birth)
+        if len(person_ids) == 0 and birth is not None and self.person_ids(name):
+            raise LookupError(f"person not found: {name} born in {birth}")
+        elif len(person_ids) == 0:
+            suggestions = [match for _, match in self.fuzzy(name, max_distance=1, limit=3)]
+            hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+            raise LookupError(f"person not found: {name}{hint}")
+        elif len(person_ids) > 1:
+            raise LookupError(
+                f"ambiguous name: {name} (IDs {', '.join(person_ids)})"
+            )
+        return person_ids[0]
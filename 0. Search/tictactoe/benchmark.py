@@ -0,0 +1,140 @@
+"""
+Benchmark for the Tic Tac Toe engines
+
+Runs each engine over a fixed set of positions and reports latency percentiles,
+plus the nodes searched, nodes/sec and boards deep-copied for engines the
+instrumentation can see into.
+
+Usage: python benchmark.py [repeats] [output.json]
+"""
+
+import json
+import sys
+import time
+
+import bitboard
+import instrumentation
+import tictactoe as ttt
+
+# Fixed positions, as boardKey strings, covering the opening, middle game and a forced win
+POSITIONS = (
+    "---------",
+    "----X----",
+    "X---O----",
+    "X-------O",
+    "XO--X----",
+    "XO-OX----",
+    "XX-OO----",
+)
+
+
+def coldMinimax(board):
+    ttt.clearTable()
+    return ttt.minimax(board, useBook=False)
+
+
+def warmMinimax(board):
+    return ttt.minimax(board, useBook=False)
+
+
+def coldSymmetric(board):
+    ttt.clearTable()
+    return ttt.minimax(board, symmetric=True, useBook=False)
+
+
+def coldBitboard(board):
+    bitboard.transpositionTable.clear()
+    return bitboard.minimax(board)
+
+
+def reset():
+    ttt.clearTable()
+    bitboard.transpositionTable.clear()
+
+
+# Maps engine names to (move function, whether it runs through tictactoe's instrumented search)
+ENGINES = {
+    "minimax": (coldMinimax, True),
+    "minimax (warm table)": (warmMinimax, True),
+    "symmetric": (coldSymmetric, True),
+    "bitboard": (coldBitboard, False),
+}
+
+
+def run(engine, repeats):
+    """
+    Runs the engine over every position repeats times, starting from empty
+    transposition tables, and returns the time each move took.
+    """
+    reset()
+    latencies = []
+    for _ in range(repeats):
+        for key in POSITIONS:
+            board = ttt.keyToBoard(key)
+            start = time.perf_counter()
+            engine(board)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def benchmark(engine, instrumented, repeats):
+    """
+    Returns a dict of results for one engine over every position.
+    """
+    latencies = run(engine, repeats)
+
+    results = {
+        "moves": len(latencies),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+    }
+
+    if instrumented:
+        # Count the work in a separate pass, so the counting doesn't slow down the timed runs.
+        # It repeats the timed runs exactly, from the same empty tables, so engines that keep
+        # their tables between moves do the same work in both
+        with instrumentation.instrumented() as stats:
+            run(engine, repeats)
+        totals = stats.totals()
+        results["nodes_per_move"] = totals["nodes"] / len(latencies)
+        results["cutoffs_per_move"] = totals["cutoffs"] / len(latencies)
+        results["deepcopies_per_move"] = totals["deepcopies"] / len(latencies)
+        results["nodes_per_second"] = totals["nodes"] / sum(latencies)
+    return results
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values (nearest rank).
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100)) # Ceiling of len * p / 100
+    return ordered[rank - 1]
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [repeats] [output.json]")
+    repeats = int(sys.argv[1]) if len(sys.argv) >= 2 else 5
+
+    results = {}
+    for name, (engine, instrumented) in ENGINES.items():
+        results[name] = benchmark(engine, instrumented, repeats)
+        result = results[name]
+        line = (f"{name:22} p50 {result['latency_p50'] * 1000:8.2f}ms  "
+                f"p95 {result['latency_p95'] * 1000:8.2f}ms  "
+                f"p99 {result['latency_p99'] * 1000:8.2f}ms")
+        if instrumented:
+            line += (f"  {result['nodes_per_move']:8.0f} nodes/move"
+                     f"  {result['nodes_per_second']:9.0f} nodes/s"
+                     f"  {result['deepcopies_per_move']:8.0f} deepcopies/move")
+        print(line)
+
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Tic Tac Toe Player using bitboards
+
+Each player's squares are stored as a 9-bit integer, where square (i, j) is bit 3 * i + j.
+The functions with the same names as in tictactoe.py take and return the usual list boards,
+so this module can be used in place of tictactoe (e.g. by runner.py).
+"""
+
+from tictactoe import X, O, EMPTY, initial_state
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000, # Rows
+    0b001001001, 0b010010010, 0b100100100, # Columns
+    0b100010001, 0b001010100 # Diagonals
+)
+
+# WINNING[bits] is True if the squares in bits include three in a row
+WINNING = tuple(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+# The single-bit mask for each square
+SQUARES = tuple(1 << square for square in range(9))
+
+# Transposition table shared across calls to minimax: maps (mover, opponent) to a (value, flag) pair
+# Values are from the point of view of the player about to move
+EXACT = 0
+LOWERBOUND = 1
+UPPERBOUND = 2
+transpositionTable = {}
+
+
+def fromBoard(board):
+    """
+    Returns the (x, o) bitboards for a list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= SQUARES[3 * i + j]
+            elif board[i][j] == O:
+                o |= SQUARES[3 * i + j]
+    return x, o
+
+
+def toBoard(x, o):
+    """
+    Returns the list board for the (x, o) bitboards.
+    """
+    board = initial_state()
+    for square in range(9):
+        if x & SQUARES[square]:
+            board[square // 3][square % 3] = X
+        elif o & SQUARES[square]:
+            board[square // 3][square % 3] = O
+    return board
+
+
+def moves(x, o):
+    """
+    Yields the single-bit mask of each empty square.
+    """
+    empty = FULL & ~(x | o)
+    while empty:
+        move = empty & -empty # Lowest set bit
+        yield move
+        empty ^= move
+
+
+def bitPlayer(x, o):
+    """
+    Returns the player who has the next turn.
+    """
+    return X if bin(x).count("1") == bin(o).count("1") else O
+
+
+def bitWinner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINNING[x]:
+        return X
+    elif WINNING[o]:
+        return O
+    return None
+
+
+def bitTerminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WINNING[x] or WINNING[o] or (x | o) == FULL
+
+
+def negamax(mover, opponent, alpha, beta):
+    """
+    Returns the value of the position for the player to move (1 win, 0 tie, -1 loss),
+    exact if it lies within (alpha, beta) and a bound on it otherwise.
+    """
+    if WINNING[opponent]: # The last move won the game
+        return -1
+    if (mover | opponent) == FULL:
+        return 0
+
+    key = (mover, opponent)
+    entry = transpositionTable.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT or (flag == LOWERBOUND and value >= beta) or (flag == UPPERBOUND and value <= alpha):
+            return value
+
+    alphaAtStart = alpha
+    v = -2
+    for move in moves(mover, opponent):
+        v = max(v, -negamax(opponent, mover | move, -beta, -alpha))
+        if v >= beta: # Alpha-Beta Pruning
+            break
+        alpha = max(alpha, v)
+
+    if v <= alphaAtStart:
+        transpositionTable[key] = (v, UPPERBOUND)
+    elif v >= beta:
+        transpositionTable[key] = (v, LOWERBOUND)
+    else:
+        transpositionTable[key] = (v, EXACT)
+    return v
+
+
+def bestMove(x, o):
+    """
+    Returns the single-bit mask of the optimal move for the player to move, or None if the game is over.
+    """
+    if bitTerminal(x, o):
+        return None
+
+    mover, opponent = (x, o) if bitPlayer(x, o) == X else (o, x)
+    bestValue = -2
+    best = None
+    for move in moves(mover, opponent):
+        value = -negamax(opponent, mover | move, -1, -bestValue)
+        if value > bestValue:
+            bestValue = value
+            best = move
+            if value == 1: # Can't do better than a win
+                break
+    return best
+
+
+# List board interface, matching tictactoe.py
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return bitPlayer(*fromBoard(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {divmod(move.bit_length() - 1, 3) for move in moves(*fromBoard(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if board[i][j] != EMPTY:
+        raise Exception("Not a valid move")
+
+    newBoard = [row[:] for row in board] # Only the rows need copying, the squares are strings
+    newBoard[i][j] = player(board)
+    return newBoard
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    return bitWinner(*fromBoard(board))
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return bitTerminal(*fromBoard(board))
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    theWinner = winner(board)
+    if theWinner == X:
+        return 1
+    elif theWinner == O:
+        return -1
+    else:
+        return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    move = bestMove(*fromBoard(board))
+    if move is None:
+        return None
+    return divmod(move.bit_length() - 1, 3)
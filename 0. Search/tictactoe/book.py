@@ -0,0 +1,130 @@
+"""
+Opening book builder for Tic Tac Toe
+
+Enumerates every board that can come up in a game, records the optimal action and value
+for each, and writes them to tictactoe.BOOK_FILE, where minimax looks them up.
+
+Usage: python book.py build|verify [path]
+"""
+
+import math
+import sys
+
+import tictactoe as ttt
+
+
+def reachableBoards():
+    """
+    Returns a dict mapping boardKey to board for every board reachable from the initial state.
+    """
+    boards = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = ttt.boardKey(board)
+        if key in boards:
+            continue
+        boards[key] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return boards
+
+
+def build(path=ttt.BOOK_FILE):
+    """
+    Solves every reachable board and writes the opening book to path.
+    Returns the number of boards in the book.
+    """
+    boards = reachableBoards()
+    values = {}
+
+    def value(key):
+        """Returns the exact minimax value of a board, solving each board once."""
+        if key not in values:
+            board = boards[key]
+            if ttt.terminal(board):
+                values[key] = ttt.utility(board)
+            else:
+                children = [value(ttt.boardKey(ttt.result(board, action))) for action in ttt.actions(board)]
+                values[key] = max(children) if ttt.player(board) == ttt.X else min(children)
+        return values[key]
+
+    table = bytearray([ttt.BOOK_MISSING]) * ttt.BOOK_SIZE
+    for key, board in boards.items():
+        best = None
+        if not ttt.terminal(board):
+            # Take the first optimal action in sorted order, so the book is the same on every build
+            best = next(
+                action for action in sorted(ttt.actions(board))
+                if value(ttt.boardKey(ttt.result(board, action))) == value(key)
+            )
+        table[ttt.bookIndex(board)] = ttt.encodeBookEntry(best, value(key))
+
+    with open(path, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(table)
+    return len(boards)
+
+
+def verify(path=ttt.BOOK_FILE):
+    """
+    Checks every reachable board's book entry against a live alpha-beta search.
+    Returns a list of (board key, problem) pairs, empty if the book is correct.
+    """
+    if not ttt.loadBook(path):
+        return [("", f"no valid opening book at {path}")]
+
+    problems = []
+    for key, board in reachableBoards().items():
+        entry = ttt.bookLookup(board)
+        if entry is None:
+            problems.append((key, "missing"))
+            continue
+
+        action, value = entry
+        if ttt.terminal(board):
+            if action is not None or value != ttt.utility(board):
+                problems.append((key, "wrong entry for a finished game"))
+            continue
+
+        live = searchValue(board)
+        if value != live:
+            problems.append((key, f"value {value}, search says {live}"))
+        elif action not in ttt.actions(board):
+            problems.append((key, f"illegal action {action}"))
+        elif searchValue(ttt.result(board, action)) != live:
+            problems.append((key, f"action {action} is not optimal"))
+    return problems
+
+
+def searchValue(board):
+    """
+    Returns the exact value of a board from the live search.
+    """
+    if ttt.terminal(board):
+        return ttt.utility(board)
+    if ttt.player(board) == ttt.X:
+        return ttt.maxValue(board, -math.inf, math.inf)
+    return ttt.minValue(board, -math.inf, math.inf)
+
+
+def main():
+    if len(sys.argv) not in (2, 3) or sys.argv[1] not in ("build", "verify"):
+        sys.exit("Usage: python book.py build|verify [path]")
+    path = sys.argv[2] if len(sys.argv) == 3 else ttt.BOOK_FILE
+
+    if sys.argv[1] == "build":
+        count = build(path)
+        print(f"Wrote {count} boards to {path}.")
+    else:
+        problems = verify(path)
+        for key, problem in problems:
+            print(f"{key}: {problem}")
+        if problems:
+            sys.exit(f"{len(problems)} problems found.")
+        print("Opening book matches the search.")
+
+
+if __name__ == "__main__":
+    main()
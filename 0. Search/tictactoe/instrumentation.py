@@ -0,0 +1,105 @@
+"""
+Opt-in instrumentation for the Tic Tac Toe search
+
+While a SearchStats is installed as tictactoe.searchStats, the search counts the boards it
+visits, the alpha-beta cutoffs it makes, the finished games it evaluates and the boards it
+copies, broken down by depth below the board minimax was called on.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+
+import tictactoe as ttt
+
+
+class SearchStats():
+    """
+    Counts the work done by the search, per move and overall.
+    """
+
+    def __init__(self):
+        self.moves = [] # One MoveStats per call to minimax
+        self.current = None # The MoveStats of the call in progress
+        self.rootPieces = 0
+
+    def startMove(self, board):
+        self.current = MoveStats()
+        self.moves.append(self.current)
+        self.rootPieces = pieces(board)
+
+    def endMove(self):
+        self.current = None
+
+    def depth(self, board):
+        return pieces(board) - self.rootPieces
+
+    def visit(self, board):
+        if self.current is not None:
+            self.current.nodes[self.depth(board)] += 1
+
+    def terminal(self, board):
+        if self.current is not None:
+            self.current.terminals[self.depth(board)] += 1
+
+    def cutoff(self, board):
+        if self.current is not None:
+            self.current.cutoffs[self.depth(board)] += 1
+
+    def copied(self):
+        if self.current is not None: # Copies made by the game itself, between moves, aren't counted
+            self.current.deepcopies += 1
+
+    def totals(self):
+        """
+        Returns a dict of the counts summed over every move.
+        """
+        return {
+            "moves": len(self.moves),
+            "nodes": sum(move.total("nodes") for move in self.moves),
+            "cutoffs": sum(move.total("cutoffs") for move in self.moves),
+            "terminals": sum(move.total("terminals") for move in self.moves),
+            "deepcopies": sum(move.deepcopies for move in self.moves)
+        }
+
+
+class MoveStats():
+    """
+    Counts for a single call to minimax, each a Counter keyed by depth below the root.
+    """
+
+    def __init__(self):
+        self.nodes = Counter()
+        self.cutoffs = Counter()
+        self.terminals = Counter()
+        self.deepcopies = 0
+
+    def total(self, counter):
+        return sum(getattr(self, counter).values())
+
+    def byDepth(self):
+        """
+        Returns a list of (depth, nodes, cutoffs, terminals) rows.
+        """
+        depths = sorted(set(self.nodes) | set(self.cutoffs) | set(self.terminals))
+        return [(depth, self.nodes[depth], self.cutoffs[depth], self.terminals[depth]) for depth in depths]
+
+
+def pieces(board):
+    """
+    Returns the number of pieces on the board.
+    """
+    return sum(square != ttt.EMPTY for row in board for square in row)
+
+
+@contextmanager
+def instrumented():
+    """
+    Installs a new SearchStats for the duration of a with block and yields it.
+    """
+    previous = ttt.searchStats
+    stats = SearchStats()
+    ttt.searchStats = stats
+    try:
+        yield stats
+    finally:
+        ttt.searchStats = previous
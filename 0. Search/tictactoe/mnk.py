@@ -0,0 +1,330 @@
+"""
+Generalized m,n,k Tic Tac Toe Player
+
+Plays on a board with m rows and n columns, where the first player to get k in a row
+(horizontally, vertically or diagonally) wins. Exhaustive minimax is hopeless on boards
+much bigger than 3x3, so the search is alpha-beta with iterative deepening under a time
+budget, and boards it can't search to the end are scored by a heuristic evaluation.
+"""
+
+import random
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Scores above WIN - (number of squares) mean somebody can force a win
+WIN = 1000000
+
+# Flags saying what a value stored in the transposition table means
+EXACT = 0
+LOWERBOUND = 1
+UPPERBOUND = 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget for a move runs out."""
+
+
+class MNKGame():
+    """
+    An m x n board with k in a row to win. The methods named as in tictactoe.py take
+    and return the same list boards, so a game can be passed to runner.py in place of
+    the tictactoe module.
+    """
+
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, rows=3, columns=3, k=3, timeLimit=0.9, maxDepth=None):
+        if k > max(rows, columns):
+            raise ValueError("k can't be more than the length of the board")
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.timeLimit = timeLimit # Seconds per move
+        self.maxDepth = maxDepth # Plies per move, or None to search as deep as time allows
+        self.size = rows * columns
+
+        # Every window of k squares in a line, as tuples of square indices (3 * i + j on a 3x3 board)
+        self.windows = []
+        for i in range(rows):
+            for j in range(columns):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    endI = i + di * (k - 1)
+                    endJ = j + dj * (k - 1)
+                    if 0 <= endI < rows and 0 <= endJ < columns:
+                        self.windows.append(tuple((i + di * step) * columns + j + dj * step for step in range(k)))
+
+        # Heuristic weight of a window holding only one player's pieces, by how many it holds
+        self.weights = [0] + [4 ** count for count in range(1, k)] + [WIN]
+
+        # Squares nearer the centre take part in more lines, so are tried first when nothing else is known
+        centerI = (rows - 1) / 2
+        centerJ = (columns - 1) / 2
+        self.centrality = [-(abs(square // columns - centerI) + abs(square % columns - centerJ)) for square in range(self.size)]
+
+        # Zobrist hashing: a random number per (square, player), XOR-ed together for the pieces on the board
+        rng = random.Random(0)
+        self.zobrist = {player: [rng.getrandbits(64) for _ in range(self.size)] for player in (X, O)}
+
+        # Kept across moves: the transposition table maps a board's hash to (depth, value, flag, best move),
+        #  and history counts how often each (player, square) move caused a cutoff
+        self.transpositionTable = {}
+        self.history = {player: [0] * self.size for player in (X, O)}
+        self.nodes = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.columns for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        xs = sum(row.count(X) for row in board)
+        os = sum(row.count(O) for row in board)
+        return X if xs == os else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.rows) for j in range(self.columns) if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise Exception("Not a valid move")
+
+        newBoard = [row[:] for row in board]
+        newBoard[i][j] = self.player(board)
+        return newBoard
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = self.flatten(board)
+        for window in self.windows:
+            first = cells[window[0]]
+            if first != EMPTY and all(cells[square] == first for square in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(EMPTY not in row for row in board)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        theWinner = self.winner(board)
+        if theWinner == X:
+            return 1
+        elif theWinner == O:
+            return -1
+        else:
+            return 0
+
+    def minimax(self, board):
+        """
+        Returns the best action found for the current player on the board within the time budget.
+        """
+        if self.terminal(board):
+            return None
+
+        self.prepare(board, time.monotonic() + self.timeLimit)
+
+        # Iterative deepening: each finished depth gives a move to fall back on and orders the next, deeper search
+        moves = self.orderedMoves(None, 0)
+        bestMove = moves[0]
+        maxDepth = self.empty if self.maxDepth is None else min(self.maxDepth, self.empty)
+        for depth in range(1, maxDepth + 1):
+            try:
+                value, move = self.searchRoot(moves, depth)
+            except SearchTimeout:
+                break
+            bestMove = move
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) > WIN - self.size: # Found a forced result, searching deeper won't change it
+                break
+
+        return divmod(bestMove, self.columns)
+
+    def prepare(self, board, deadline):
+        """
+        Sets up the search state for a new search of the board, which has to stop
+        by deadline on the time.monotonic() clock.
+        """
+        self.cells = self.flatten(board)
+        self.mover = self.player(board)
+        self.hash = 0
+        for square, piece in enumerate(self.cells):
+            if piece != EMPTY:
+                self.hash ^= self.zobrist[piece][square]
+        self.empty = self.cells.count(EMPTY)
+        self.killers = [[None, None] for _ in range(self.empty + 1)]
+        self.deadline = deadline
+        self.nodes = 0
+
+    def searchRoot(self, moves, depth):
+        """
+        Searches every move at the root to the given depth, returning (value, best move).
+        """
+        alpha = -WIN - 1
+        bestMove = moves[0]
+        for move in moves:
+            self.play(move)
+            value = -self.negamax(depth - 1, 1, -WIN - 1, -alpha, move)
+            self.undo(move)
+            if value > alpha:
+                alpha = value
+                bestMove = move
+        return alpha, bestMove
+
+    def negamax(self, depth, ply, alpha, beta, lastMove):
+        """
+        Returns the value of the board for the player to move, searching depth more plies.
+        The value is exact if it lies within (alpha, beta) and a bound on it otherwise.
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and time.monotonic() > self.deadline:
+            raise SearchTimeout
+
+        if self.completesLine(lastMove): # The last move won the game; prefer quicker wins
+            return -(WIN - ply)
+        if self.empty == 0:
+            return 0
+        if depth == 0:
+            return self.evaluate()
+
+        entry = self.transpositionTable.get(self.hash)
+        tableMove = None
+        if entry is not None:
+            entryDepth, value, flag, tableMove = entry
+            if entryDepth >= depth:
+                if flag == EXACT or (flag == LOWERBOUND and value >= beta) or (flag == UPPERBOUND and value <= alpha):
+                    return value
+
+        alphaAtStart = alpha
+        v = -WIN - 1
+        bestMove = None
+        for move in self.orderedMoves(tableMove, ply):
+            self.play(move)
+            value = -self.negamax(depth - 1, ply + 1, -beta, -alpha, move)
+            self.undo(move)
+
+            if value > v:
+                v = value
+                bestMove = move
+            if v > alpha:
+                alpha = v
+            if alpha >= beta: # Alpha-Beta Pruning; remember the move that caused it
+                killers = self.killers[ply]
+                if killers[0] != move:
+                    killers[1] = killers[0]
+                    killers[0] = move
+                self.history[self.mover][move] += depth * depth
+                break
+
+        if v <= alphaAtStart:
+            flag = UPPERBOUND
+        elif v >= beta:
+            flag = LOWERBOUND
+        else:
+            flag = EXACT
+        self.transpositionTable[self.hash] = (depth, v, flag, bestMove)
+        return v
+
+    def orderedMoves(self, tableMove, ply):
+        """
+        Returns the empty squares in the order to search them: the transposition table's
+        best move, then the killer moves for this ply, then by history and centrality.
+        """
+        history = self.history[self.mover]
+        centrality = self.centrality
+        moves = [square for square in range(self.size) if self.cells[square] == EMPTY]
+        moves.sort(key=lambda square: (history[square], centrality[square]), reverse=True)
+
+        first = [tableMove] + self.killers[ply]
+        for move in reversed(first):
+            if move is not None and self.cells[move] == EMPTY:
+                moves.remove(move)
+                moves.insert(0, move)
+        return moves
+
+    def play(self, move):
+        """
+        Places the player to move's piece on square move, updating the hash in place.
+        """
+        self.cells[move] = self.mover
+        self.hash ^= self.zobrist[self.mover][move]
+        self.empty -= 1
+        self.mover = O if self.mover == X else X
+
+    def undo(self, move):
+        """
+        Takes back the piece on square move.
+        """
+        self.mover = O if self.mover == X else X
+        self.empty += 1
+        self.hash ^= self.zobrist[self.mover][move]
+        self.cells[move] = EMPTY
+
+    def completesLine(self, move):
+        """
+        Returns True if the piece on square move is part of k in a row.
+        """
+        if move is None:
+            return False
+        piece = self.cells[move]
+        i, j = divmod(move, self.columns)
+        for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                r, c = i + sign * di, j + sign * dj
+                while 0 <= r < self.rows and 0 <= c < self.columns and self.cells[r * self.columns + c] == piece:
+                    count += 1
+                    r, c = r + sign * di, c + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def evaluate(self):
+        """
+        Returns a heuristic value of a board that isn't finished, for the player to move:
+        every window of k squares that only one player has pieces in counts for that player,
+        more so the more pieces it holds.
+        """
+        cells = self.cells
+        weights = self.weights
+        score = 0
+        for window in self.windows:
+            xs = os = 0
+            for square in window:
+                piece = cells[square]
+                if piece == X:
+                    xs += 1
+                elif piece == O:
+                    os += 1
+            if os == 0:
+                score += weights[xs]
+            elif xs == 0:
+                score -= weights[os]
+        return score if self.mover == X else -score
+
+    def flatten(self, board):
+        """
+        Returns the board's squares as one list, row by row.
+        """
+        return [square for row in board for square in row]
@@ -0,0 +1,117 @@
+"""
+Parallel root-split search for the m,n,k Tic Tac Toe Player
+
+The moves available at the root are independent subtrees, so each depth of the iterative
+deepening hands them out to a pool of worker processes. Workers share the best value found
+so far at the root, so a subtree searched after a good move has been found can still be pruned.
+A worker only reads the shared value when it starts a subtree, so a better value found
+meanwhile doesn't tighten the subtrees already being searched.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mnk import MNKGame, SearchTimeout, WIN
+
+# Set in each worker process by startWorker
+workerGame = None
+sharedBound = None
+
+
+def startWorker(rows, columns, k, bound):
+    """
+    Gives a worker process its own game (and so its own transposition table) and the shared root bound.
+    """
+    global workerGame, sharedBound
+    workerGame = MNKGame(rows, columns, k)
+    sharedBound = bound
+
+
+def searchMove(board, move, depth, deadline):
+    """
+    Searches the root move on the board to depth plies in total, stopping by deadline
+    on the time.monotonic() clock (which every process on the machine shares).
+
+    Returns (value, exact), where value is only an upper bound on the move's value if exact is False,
+    or None if time ran out.
+    """
+    if time.monotonic() > deadline: # Waited in the queue until time ran out
+        return None
+    workerGame.prepare(board, deadline)
+    alpha = sharedBound.value # The best value any root move is known to have so far, read only once
+    workerGame.play(move)
+    try:
+        value = -workerGame.negamax(depth - 1, 1, -WIN - 1, -alpha, move)
+    except SearchTimeout:
+        return None
+
+    if value > alpha:
+        with sharedBound.get_lock():
+            if value > sharedBound.value:
+                sharedBound.value = value
+    return value, value > alpha
+
+
+class ParallelMNKGame(MNKGame):
+    """
+    An m,n,k game whose minimax searches the root moves in parallel, using workers
+    processes (by default, one per core).
+    """
+
+    def __init__(self, rows=3, columns=3, k=3, timeLimit=0.9, maxDepth=None, workers=None):
+        super().__init__(rows, columns, k, timeLimit, maxDepth)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.bound = None
+
+    def minimax(self, board):
+        """
+        Returns the best action found for the current player on the board within the time budget.
+        """
+        if self.workers == 1:
+            return super().minimax(board)
+        if self.terminal(board):
+            return None
+
+        if self.executor is None:
+            self.bound = multiprocessing.Value("q", -WIN - 1)
+            self.executor = ProcessPoolExecutor(
+                self.workers, initializer=startWorker,
+                initargs=(self.rows, self.columns, self.k, self.bound)
+            )
+
+        deadline = time.monotonic() + self.timeLimit
+        self.prepare(board, deadline)
+        moves = self.orderedMoves(None, 0)
+        bestMove = moves[0]
+        maxDepth = self.empty if self.maxDepth is None else min(self.maxDepth, self.empty)
+
+        for depth in range(1, maxDepth + 1):
+            self.bound.value = -WIN - 1
+            futures = [
+                self.executor.submit(searchMove, board, move, depth, deadline)
+                for move in moves
+            ]
+            results = [future.result() for future in futures]
+            if None in results: # Ran out of time part way through this depth
+                break
+
+            # The best move is the highest value, preferring exact values over bounds that merely equal it
+            (value, _), move = max(zip(results, moves), key=lambda pair: pair[0])
+            bestMove = move
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) > WIN - self.size: # Found a forced result, searching deeper won't change it
+                break
+
+        return divmod(bestMove, self.columns)
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
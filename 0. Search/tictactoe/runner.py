@@ -1,146 +1,229 @@
+import multiprocessing
 import pygame
+import queue
 import sys
 import time
 
-import tictactoe as ttt
-
-pygame.init()
-size = width, height = 600, 400
-
-# Colors
-black = (0, 0, 0)
-white = (255, 255, 255)
-
-screen = pygame.display.set_mode(size)
-
-mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
-largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
-
-user = None
-board = ttt.initial_state()
-ai_turn = False
-
-while True:
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    screen.fill(black)
-
-    # Let user choose a player.
-    if user is None:
-
-        # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Draw buttons
-        playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
-        playX = mediumFont.render("Play as X", True, black)
-        playXRect = playX.get_rect()
-        playXRect.center = playXButton.center
-        pygame.draw.rect(screen, white, playXButton)
-        screen.blit(playX, playXRect)
-
-        playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
-        playO = mediumFont.render("Play as O", True, black)
-        playORect = playO.get_rect()
-        playORect.center = playOButton.center
-        pygame.draw.rect(screen, white, playOButton)
-        screen.blit(playO, playORect)
-
-        # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.O
-
-    else:
-
-        # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
-        tiles = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                rect = pygame.Rect(
-                    tile_origin[0] + j * tile_size,
-                    tile_origin[1] + i * tile_size,
-                    tile_size, tile_size
-                )
-                pygame.draw.rect(screen, white, rect, 3)
-
-                if board[i][j] != ttt.EMPTY:
-                    move = moveFont.render(board[i][j], True, white)
-                    moveRect = move.get_rect()
-                    moveRect.center = rect.center
-                    screen.blit(move, moveRect)
-                row.append(rect)
-            tiles.append(row)
-
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
-
-        # Show title
-        if game_over:
-            winner = ttt.winner(board)
-            if winner is None:
-                title = f"Game Over: Tie."
-            else:
-                title = f"Game Over: {winner} wins."
-        elif user == player:
-            title = f"Play as {user}"
-        else:
-            title = f"Computer thinking..."
-        title = largeFont.render(title, True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 30)
-        screen.blit(title, titleRect)
-
-        # Check for AI move
-        if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
-
-        # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
+import tictactoe
+from mnk import MNKGame
+
+
+class MoveWorker():
+    """
+    Computes the AI's moves in one long-lived process, so the window keeps drawing while the engine
+    searches, and the engine keeps what it has learned (its transposition table and history) from move to move.
+    """
+
+    def __init__(self, game):
+        self.requests = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=serveMoves, args=(game, self.requests, self.results), daemon=True
+        )
+        self.process.start()
+        self.sent = 0 # Number of the last board sent to the worker
+        self.pending = False
+
+    def start(self, board):
+        self.sent += 1
+        self.pending = True
+        self.requests.put((self.sent, board))
+
+    def busy(self):
+        return self.pending
+
+    def poll(self):
+        """
+        Returns the computed move once it's ready, None until then.
+        """
+        if not self.pending:
+            return None
+        while True:
+            try:
+                number, move = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if number == self.sent: # Anything else is the move from a cancelled search
+                self.pending = False
+                return move
+
+    def cancel(self):
+        """
+        Forgets the search in progress. The worker still finishes it, but its move is ignored.
+        """
+        self.pending = False
+
+    def close(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def serveMoves(game, requests, results):
+    """
+    Runs in the worker process, answering each numbered board with the engine's move.
+    """
+    engine = tictactoe if game is None else game # An MNKGame, or None for the tictactoe module
+    while True:
+        number, board = requests.get()
+        results.put((number, engine.minimax(board)))
+
+
+def main():
+    ttt = tictactoe
+
+    # python runner.py rows columns k plays on a bigger board, e.g. python runner.py 5 5 4
+    if len(sys.argv) == 4:
+        ttt = MNKGame(*(int(arg) for arg in sys.argv[1:]))
+    elif len(sys.argv) != 1:
+        sys.exit("Usage: python runner.py [rows columns k]")
+
+    pygame.init()
+    size = width, height = 600, 400
+
+    # Colors
+    black = (0, 0, 0)
+    white = (255, 255, 255)
+
+    screen = pygame.display.set_mode(size)
+
+    mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
+    largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
+    moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60 if len(ttt.initial_state()) <= 3 else 36)
+
+    user = None
+    board = ttt.initial_state()
+    worker = MoveWorker(ttt if isinstance(ttt, MNKGame) else None)
+    clock = pygame.time.Clock()
+
+    while True:
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                worker.close()
+                sys.exit()
+
+        screen.fill(black)
+
+        # Let user choose a player.
+        if user is None:
+
+            # Draw title
+            title = largeFont.render("Play Tic-Tac-Toe", True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 50)
+            screen.blit(title, titleRect)
+
+            # Draw buttons
+            playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
+            playX = mediumFont.render("Play as X", True, black)
+            playXRect = playX.get_rect()
+            playXRect.center = playXButton.center
+            pygame.draw.rect(screen, white, playXButton)
+            screen.blit(playX, playXRect)
+
+            playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
+            playO = mediumFont.render("Play as O", True, black)
+            playORect = playO.get_rect()
+            playORect.center = playOButton.center
+            pygame.draw.rect(screen, white, playOButton)
+            screen.blit(playO, playORect)
+
+            # Check if button is clicked
             click, _, _ = pygame.mouse.get_pressed()
             if click == 1:
                 mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
+                if playXButton.collidepoint(mouse):
                     time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    user = ttt.X
+                elif playOButton.collidepoint(mouse):
+                    time.sleep(0.2)
+                    user = ttt.O
 
-    pygame.display.flip()
+        else:
+
+            # Draw game board
+            rows = len(board)
+            columns = len(board[0])
+            tile_size = min(80, (height - 160) // rows, (width - 40) // columns)
+            tile_origin = (width / 2 - (columns / 2 * tile_size),
+                           height / 2 - (rows / 2 * tile_size))
+            tiles = []
+            for i in range(rows):
+                row = []
+                for j in range(columns):
+                    rect = pygame.Rect(
+                        tile_origin[0] + j * tile_size,
+                        tile_origin[1] + i * tile_size,
+                        tile_size, tile_size
+                    )
+                    pygame.draw.rect(screen, white, rect, 3)
+
+                    if board[i][j] != ttt.EMPTY:
+                        move = moveFont.render(board[i][j], True, white)
+                        moveRect = move.get_rect()
+                        moveRect.center = rect.center
+                        screen.blit(move, moveRect)
+                    row.append(rect)
+                tiles.append(row)
+
+            game_over = ttt.terminal(board)
+            player = ttt.player(board)
+
+            # Show title
+            if game_over:
+                winner = ttt.winner(board)
+                if winner is None:
+                    title = f"Game Over: Tie."
+                else:
+                    title = f"Game Over: {winner} wins."
+            elif user == player:
+                title = f"Play as {user}"
+            else:
+                dots = pygame.time.get_ticks() // 300 % 4 # Animate while the engine searches
+                title = "Computer thinking" + "." * dots
+            title = largeFont.render(title, True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 30)
+            screen.blit(title, titleRect)
+
+            # Check for AI move, starting the search in the background and picking up its result when it's done
+            if user != player and not game_over:
+                if not worker.busy():
+                    worker.start(board)
+                else:
+                    move = worker.poll()
+                    if move is not None:
+                        board = ttt.result(board, move)
+
+            # Check for a user move
+            click, _, _ = pygame.mouse.get_pressed()
+            if click == 1 and user == player and not game_over:
+                mouse = pygame.mouse.get_pos()
+                for i in range(rows):
+                    for j in range(columns):
+                        if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+                            board = ttt.result(board, (i, j))
+
+            # Offer to start again once the game is over, or to cancel the search while the computer is thinking
+            if game_over or worker.busy():
+                againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+                again = mediumFont.render("Play Again", True, black)
+                againRect = again.get_rect()
+                againRect.center = againButton.center
+                pygame.draw.rect(screen, white, againButton)
+                screen.blit(again, againRect)
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1:
+                    mouse = pygame.mouse.get_pos()
+                    if againButton.collidepoint(mouse):
+                        time.sleep(0.2)
+                        worker.cancel()
+                        user = None
+                        board = ttt.initial_state()
+
+        pygame.display.flip()
+        clock.tick(60)
+
+
+if __name__ == "__main__":
+    main()
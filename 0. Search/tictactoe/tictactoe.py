@@ -4,11 +4,15 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Set to an instrumentation.SearchStats to count the work the search does (see instrumentation.py)
+searchStats = None
+
 
 def initial_state():
     """
@@ -55,6 +59,8 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
+    if searchStats is not None:
+        searchStats.copied()
     newBoard = copy.deepcopy(board)
     currentPlayer = player(board)
     i, j = action
@@ -113,65 +119,341 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def minimax(board, symmetric=False, useBook=True):
     """
     Returns the optimal action for the current player on the board.
+
+    If useBook is True and an opening book has been built (see book.py),
+    the action is looked up in it instead of searched for.
+
+    If symmetric is True, the search treats boards that are rotations or
+    reflections of each other as the same board and skips symmetric duplicate
+    moves, which returns a move of the same value while searching far fewer boards.
     """
     if terminal(board):
         return None
 
+    if searchStats is not None:
+        searchStats.startMove(board)
+
+    entry = bookLookup(board) if useBook else None
+    if entry is not None:
+        action = entry[0]
+    elif symmetric:
+        # Search the canonical orientation of the board, then turn the chosen move back to match the real one
+        key, symmetry = canonicalKey(board)
+        action = bestAction(keyToBoard(key), symmetric)
+        action = SYMMETRIES[INVERSES[symmetry]](*action)
+    else:
+        action = bestAction(board, symmetric)
+
+    if searchStats is not None:
+        searchStats.endMove()
+    return action
+
+
+def bestAction(board, symmetric):
+    """
+    Searches the actions on a non-terminal board, returning the best one for the current player.
+    """
     currentPlayer = player(board)
-    
+    alpha = float('-inf')
+    beta = float('inf')
+
     if currentPlayer == X: # Trying to maximize score
         v = float('-inf')
-        bestAction = None
-        for action in actions(board):
-            minimum = minValue(result(board, action), v)
+        chosenAction = None
+        for action in searchActions(board, symmetric):
+            minimum = minValue(result(board, action), alpha, beta, symmetric)
             if v < minimum:
                 v = minimum
-                bestAction = action
+                chosenAction = action
+                alpha = v
+                if v == 1: # Can't do better than a win
+                    break
 
-        return bestAction
+        return chosenAction
     else: # Trying to minimize score
         v = float('inf')
-        bestAction = None
-        for action in actions(board):
-            maximum = maxValue(result(board, action), v)
+        chosenAction = None
+        for action in searchActions(board, symmetric):
+            maximum = maxValue(result(board, action), alpha, beta, symmetric)
             if v > maximum:
                 v = maximum
-                bestAction = action
+                chosenAction = action
+                beta = v
+                if v == -1: # Can't do better than a win
+                    break
 
-        return bestAction
-    
-# For the following functions, valueToBeat is part of the Alpha-Beta Pruning process
-# valueToBeat is the current best option the AI has found
-# For example, if the AI is playing as X, and it has a valueToBeat of 0 (meaning it has found a set of actions it can take to guarantee at least a tie),
-#  then if it is searching other actions and finds a set of actions that leads to a result of -1 (meaning it loses), it doesn't need to check the other
-#  actions down that path because it won't ultimately end up choosing it (as it already found a better set of actions)
+        return chosenAction
+
+# The opening book is a table of the optimal action and value for every board, indexed by bookIndex
+# Each entry is one byte: the value + 1 in the high bits and the action's square (3 * i + j) in the low bits,
+#  with BOOK_NO_ACTION for finished games and BOOK_MISSING for boards that can't come up in a game
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_MAGIC = b"TTTBOOK1"
+BOOK_SIZE = 3 ** 9
+BOOK_NO_ACTION = 9
+BOOK_MISSING = 0xFF
+
+openingBook = None
+bookLoaded = False
+
+
+def bookIndex(board):
+    """
+    Returns the board's index in the opening book, reading it as a base-3 number (empty 0, X 1, O 2).
+    """
+    index = 0
+    for row in board:
+        for square in row:
+            index = 3 * index + (0 if square == EMPTY else 1 if square == X else 2)
+    return index
+
+
+def encodeBookEntry(action, value):
+    """
+    Returns the opening book byte for an action (or None) and a value.
+    """
+    square = BOOK_NO_ACTION if action is None else 3 * action[0] + action[1]
+    return (value + 1) << 4 | square
+
+
+def decodeBookEntry(entry):
+    """
+    Returns the (action, value) pair stored in an opening book byte, or None if it is missing.
+    """
+    if entry == BOOK_MISSING:
+        return None
+    square = entry & 0x0F
+    action = None if square == BOOK_NO_ACTION else divmod(square, 3)
+    return action, (entry >> 4) - 1
+
+
+def loadBook(path=BOOK_FILE):
+    """
+    Loads the opening book from path, returning True if it was found and valid.
+    """
+    global openingBook, bookLoaded
+
+    bookLoaded = True
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        openingBook = None
+        return False
+
+    if data[:len(BOOK_MAGIC)] != BOOK_MAGIC or len(data) != len(BOOK_MAGIC) + BOOK_SIZE:
+        openingBook = None
+        return False
+    openingBook = data[len(BOOK_MAGIC):]
+    return True
+
+
+def bookLookup(board):
+    """
+    Returns the (action, value) pair for the board from the opening book,
+    or None if there is no book or the board isn't in it.
+    The book is loaded from BOOK_FILE the first time it's needed.
+    """
+    if not bookLoaded:
+        loadBook()
+    if openingBook is None:
+        return None
+    return decodeBookEntry(openingBook[bookIndex(board)])
+
+
+# For the following functions, alpha and beta are part of the Alpha-Beta Pruning process
+# alpha is the best score X is already guaranteed somewhere higher up the tree, and beta is the best score O is guaranteed
+# For example, if X has found a set of actions that guarantees at least a tie (alpha = 0), then as soon as O finds a reply
+#  that leads to X losing (-1) in some other line, X won't ever choose that line, so the rest of O's options there don't need to be checked
+# Because of this, a value returned outside of (alpha, beta) is only a bound on the board's true value, not the exact value
+
+# Flags saying what a value stored in the transposition table means
+EXACT = 0
+LOWERBOUND = 1 # The board's true value is at least the stored value
+UPPERBOUND = 2 # The board's true value is at most the stored value
+
+# Transposition table shared across calls to minimax: maps boardKey(board) to a (value, flag) pair
+# Positions reached through different move orders are only searched once
+transpositionTable = {}
+tableStats = {"lookups": 0, "hits": 0, "stores": 0}
+
+
+def boardKey(board):
+    """
+    Returns a compact, hashable encoding of the board.
+    The player to move doesn't need storing, as it follows from the board.
+    """
+    return "".join(square or "-" for row in board for square in row)
+
+
+def keyToBoard(key):
+    """
+    Returns the board encoded by boardKey.
+    """
+    return [[EMPTY if square == "-" else square for square in key[i:i + 3]] for i in (0, 3, 6)]
+
+
+# The 8 symmetries of the board (rotations and reflections), each mapping a square (i, j) to where it moves
+SYMMETRIES = (
+    lambda i, j: (i, j), # Identity
+    lambda i, j: (j, 2 - i), # Rotate 90 degrees clockwise
+    lambda i, j: (2 - i, 2 - j), # Rotate 180 degrees
+    lambda i, j: (2 - j, i), # Rotate 270 degrees clockwise
+    lambda i, j: (i, 2 - j), # Reflect left to right
+    lambda i, j: (2 - i, j), # Reflect top to bottom
+    lambda i, j: (j, i), # Reflect across the main diagonal
+    lambda i, j: (2 - j, 2 - i) # Reflect across the other diagonal
+)
+
+# INVERSES[s] is the symmetry that undoes symmetry s
+INVERSES = tuple(
+    next(t for t in range(8) if all(SYMMETRIES[t](*SYMMETRIES[s](i, j)) == (i, j) for i in range(3) for j in range(3)))
+    for s in range(8)
+)
+
+# KEY_ORDERS[s] lists, for each square of the transformed board's key, which square of the original key it comes from
+KEY_ORDERS = tuple(
+    tuple(3 * i + j for i, j in (SYMMETRIES[INVERSES[s]](q // 3, q % 3) for q in range(9)))
+    for s in range(8)
+)
+
+
+def canonicalKey(board):
+    """
+    Returns (key, symmetry): the smallest boardKey among the board's 8 orientations,
+    and the index of the symmetry that turns the board into that orientation.
+    """
+    key = boardKey(board)
+    return min(("".join([key[q] for q in order]), s) for s, order in enumerate(KEY_ORDERS))
+
+
+def uniqueActions(board):
+    """
+    Returns the possible actions on the board, keeping only one of each group of
+    actions that lead to boards that are rotations or reflections of each other.
+    """
+    key = boardKey(board)
+    stabilizer = [SYMMETRIES[s] for s, order in enumerate(KEY_ORDERS) if s != 0 and "".join([key[q] for q in order]) == key]
+
+    unique = []
+    for action in sorted(actions(board)):
+        if not any(symmetry(*action) in unique for symmetry in stabilizer):
+            unique.append(action)
+    return unique
+
+
+def searchActions(board, symmetric):
+    """
+    Returns the actions the search should try on the board.
+    """
+    if symmetric:
+        return uniqueActions(board)
+    return actions(board)
+
+
+def lookup(key, alpha, beta):
+    """
+    Returns the stored value for a board if it settles the search within (alpha, beta), None otherwise.
+    """
+    tableStats["lookups"] += 1
+    entry = transpositionTable.get(key)
+    if entry is None:
+        return None
+
+    value, flag = entry
+    if flag == EXACT or (flag == LOWERBOUND and value >= beta) or (flag == UPPERBOUND and value <= alpha):
+        tableStats["hits"] += 1
+        return value
+    return None
+
+
+def store(key, value, alpha, beta):
+    """
+    Stores the value found for a board searched with the window (alpha, beta).
+    """
+    if value <= alpha:
+        flag = UPPERBOUND
+    elif value >= beta:
+        flag = LOWERBOUND
+    else:
+        flag = EXACT
+    transpositionTable[key] = (value, flag)
+    tableStats["stores"] += 1
+
+
+def tableHitRate():
+    """
+    Returns the fraction of transposition table lookups that avoided a search.
+    """
+    if tableStats["lookups"] == 0:
+        return 0.0
+    return tableStats["hits"] / tableStats["lookups"]
+
+
+def clearTable():
+    """
+    Empties the transposition table and resets its statistics.
+    """
+    transpositionTable.clear()
+    for stat in tableStats:
+        tableStats[stat] = 0
+
+
+def maxValue(board, alpha, beta, symmetric=False): # Part of minimax algorithm
+    if searchStats is not None:
+        searchStats.visit(board)
 
-def maxValue(board, valueToBeat): # Part of minimax algorithm
     if terminal(board):
+        if searchStats is not None:
+            searchStats.terminal(board)
         return utility(board)
-    
+
+    key = canonicalKey(board)[0] if symmetric else boardKey(board)
+    value = lookup(key, alpha, beta)
+    if value is not None:
+        return value
+
+    alphaAtStart = alpha
     v = float('-inf')
-    for action in actions(board):
-        v = max(v, minValue(result(board, action), valueToBeat))
+    for action in searchActions(board, symmetric):
+        v = max(v, minValue(result(board, action), alpha, beta, symmetric))
 
-        if v > valueToBeat: # Alpha-Beta Pruning
-            return v
+        if v >= beta: # Alpha-Beta Pruning
+            if searchStats is not None:
+                searchStats.cutoff(board)
+            break
+        alpha = max(alpha, v)
 
+    store(key, v, alphaAtStart, beta)
     return v
 
-def minValue(board, valueToBeat): # Part of minimax algorithm
+def minValue(board, alpha, beta, symmetric=False): # Part of minimax algorithm
+    if searchStats is not None:
+        searchStats.visit(board)
+
     if terminal(board):
+        if searchStats is not None:
+            searchStats.terminal(board)
         return utility(board)
-    
+
+    key = canonicalKey(board)[0] if symmetric else boardKey(board)
+    value = lookup(key, alpha, beta)
+    if value is not None:
+        return value
+
+    betaAtStart = beta
     v = float('inf')
-    for action in actions(board):
-        v = min(v, maxValue(result(board, action), valueToBeat))
+    for action in searchActions(board, symmetric):
+        v = min(v, maxValue(result(board, action), alpha, beta, symmetric))
 
-        if v < valueToBeat: # Alpha-Beta Pruning
-            return v
+        if v <= alpha: # Alpha-Beta Pruning
+            if searchStats is not None:
+                searchStats.cutoff(board)
+            break
+        beta = min(beta, v)
 
+    store(key, v, alpha, betaAtStart)
     return v
-
@@ -0,0 +1,171 @@
+"""
+Headless self-play tournament for the Tic Tac Toe engines
+
+Plays every pair of engines against each other (as both X and O) across a pool of processes,
+starting each game from a few random opening moves. Reports win/draw/loss counts, the time each
+engine takes per move and games per second, and checks that whenever both players are perfect
+the game ends with the value of its opening position, i.e. perfect play never loses a won or drawn game,
+and exits with a non-zero status if any game breaks that.
+
+Usage: python tournament.py [--games N] [--opening PLIES] [--engines a,b,...] [--workers N]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import tictactoe as ttt
+from mnk import MNKGame
+
+
+def plainMinimax(board):
+    ttt.clearTable()
+    return ttt.minimax(board, useBook=False)
+
+
+def cachedMinimax(board):
+    return ttt.minimax(board, useBook=False)
+
+
+def symmetricMinimax(board):
+    return ttt.minimax(board, symmetric=True, useBook=False)
+
+
+def bookMinimax(board):
+    return ttt.minimax(board)
+
+
+depthLimitedGame = MNKGame(3, 3, 3, timeLimit=math.inf, maxDepth=2)
+
+
+def randomMove(board):
+    return random.choice(sorted(ttt.actions(board)))
+
+
+# Maps engine names to (move function, whether it plays perfectly)
+ENGINES = {
+    "minimax": (plainMinimax, True),
+    "cached": (cachedMinimax, True),
+    "symmetric": (symmetricMinimax, True),
+    "bitboard": (bitboard.minimax, True),
+    "book": (bookMinimax, True), # Falls back to search when no book has been built
+    "depth2": (depthLimitedGame.minimax, False),
+    "random": (randomMove, False),
+}
+
+
+def openingValue(board):
+    """
+    Returns the value of the board under perfect play: 1 if X wins, -1 if O wins, 0 for a tie.
+    """
+    x, o = bitboard.fromBoard(board)
+    if bitboard.bitTerminal(x, o):
+        return ttt.utility(board)
+    if bitboard.bitPlayer(x, o) == ttt.X:
+        return bitboard.negamax(x, o, -2, 2)
+    return -bitboard.negamax(o, x, -2, 2)
+
+
+def playGame(task):
+    """
+    Plays one game for task = (X engine name, O engine name, seed, opening plies).
+    Returns a dict with the utility of the final board, the opening's value and each side's move times.
+    """
+    nameX, nameO, seed, opening = task
+    random.seed(seed)
+
+    board = ttt.initial_state()
+    for _ in range(opening):
+        if ttt.terminal(board):
+            break
+        board = ttt.result(board, randomMove(board))
+    value = openingValue(board)
+
+    engines = {ttt.X: ENGINES[nameX][0], ttt.O: ENGINES[nameO][0]}
+    times = {ttt.X: [], ttt.O: []}
+    while not ttt.terminal(board):
+        current = ttt.player(board)
+        start = time.perf_counter()
+        action = engines[current](board)
+        times[current].append(time.perf_counter() - start)
+        board = ttt.result(board, action)
+
+    return {"utility": ttt.utility(board), "value": value, "timesX": times[ttt.X], "timesO": times[ttt.O]}
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values (nearest rank), or None if empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100)) # Ceiling of len * p / 100
+    return ordered[rank - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the Tic Tac Toe engines against each other.")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing of engines")
+    parser.add_argument("--opening", type=int, default=2, help="random moves at the start of each game")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated engine names")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names = args.engines.split(",")
+    for name in names:
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name} (choose from {', '.join(ENGINES)})")
+
+    pairings = [(nameX, nameO) for nameX in names for nameO in names]
+    tasks = [
+        (nameX, nameO, args.seed * 1000003 + index, args.opening)
+        for nameX, nameO in pairings for index in range(args.games)
+    ]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as executor:
+        games = list(executor.map(playGame, tasks, chunksize=max(1, len(tasks) // (4 * args.workers))))
+    elapsed = time.perf_counter() - start
+
+    moveTimes = {name: [] for name in names}
+    violations = 0
+    print(f"{'X':>10} {'O':>10} {'X wins':>7} {'ties':>6} {'O wins':>7} {'wrong':>6}")
+    for index, (nameX, nameO) in enumerate(pairings):
+        results = games[index * args.games:(index + 1) * args.games]
+        counts = {1: 0, 0: 0, -1: 0}
+        wrong = 0
+        for game in results:
+            counts[game["utility"]] += 1
+            moveTimes[nameX].extend(game["timesX"])
+            moveTimes[nameO].extend(game["timesO"])
+            if ENGINES[nameX][1] and ENGINES[nameO][1] and game["utility"] != game["value"]:
+                wrong += 1
+        violations += wrong
+        print(f"{nameX:>10} {nameO:>10} {counts[1]:>7} {counts[0]:>6} {counts[-1]:>7} {wrong:>6}")
+
+    print()
+    for name in names:
+        times = moveTimes[name]
+        if not times: # e.g. the opening filled the board
+            print(f"{name:>10}: no moves")
+            continue
+        print(f"{name:>10}: {len(times)} moves, p50 {percentile(times, 50) * 1000:.3f}ms, "
+              f"p99 {percentile(times, 99) * 1000:.3f}ms, max {max(times) * 1000:.3f}ms")
+
+    print()
+    print(f"{len(games)} games in {elapsed:.2f}s ({len(games) / elapsed:.1f} games/s)")
+    if violations:
+        sys.exit(f"{violations} games between perfect engines ended differently from perfect play.")
+    else:
+        print("Every game between perfect engines ended as perfect play requires.")
+
+
+if __name__ == "__main__":
+    main()
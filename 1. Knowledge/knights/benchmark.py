@@ -0,0 +1,99 @@
+"""
+Scaling benchmark for the knights entailment backends
+
+Generates random puzzles with a unique solution for a growing number of
+characters, and times every backend at working out what each character is.
+A backend is dropped once a puzzle takes it longer than the time limit.
+
+Usage: python benchmark.py [max_characters] [time_limit]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import cnf
+import generator
+import logic
+import sat
+
+try:
+    import truthtable
+except ImportError:
+    truthtable = None
+
+SIZES = tuple(range(2, 15)) + (16, 20, 30, 40, 60, 80, 120, 160)
+
+
+def enumerated(symbols):
+    """Models checked by a backend that enumerates every assignment."""
+    return 2 ** len(symbols)
+
+
+def solved(symbols):
+    """Work done by the SAT backend since the statistics were last reset."""
+    return f"{sat.statistics['solves']} solves, {sat.statistics['conflicts']} conflicts"
+
+
+# Maps backend names to (module, how to report the models it checked)
+BACKENDS = {
+    "logic": (logic, enumerated),
+    "cnf": (cnf, enumerated),
+    "sat": (sat, solved),
+}
+if truthtable is not None:
+    BACKENDS["truthtable"] = (truthtable, enumerated)
+
+
+def run(module, knowledge, queries):
+    for key in sat.statistics:
+        sat.statistics[key] = 0
+    return module.model_check_all(knowledge, queries)
+
+
+def benchmark(module, puzzle):
+    """
+    Returns (seconds, peak bytes) for one backend on one puzzle, checking its answer.
+    """
+    queries = [puzzle.knight[name] for name in puzzle.names]
+
+    start = time.perf_counter()
+    answers = run(module, puzzle.knowledge, queries)
+    seconds = time.perf_counter() - start
+    if answers != [puzzle.solution[name] for name in puzzle.names]:
+        raise RuntimeError(f"{module.__name__} got the wrong answer")
+
+    # Measure memory in a separate run, so tracing doesn't slow down the timed one
+    tracemalloc.start()
+    run(module, puzzle.knowledge, queries)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [max_characters] [time_limit]")
+    max_characters = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    remaining = dict(BACKENDS)
+    print(f"{'chars':>5} {'symbols':>7}  {'backend':<10} {'time':>10} {'memory':>10}  models")
+    for characters in SIZES:
+        if characters > max_characters or not remaining:
+            break
+        puzzle = generator.generate(characters, 2 * characters, seed=characters)
+        symbols = puzzle.symbols()
+
+        for name, (module, models) in list(remaining.items()):
+            if module is truthtable and len(symbols) > truthtable.MAX_SYMBOLS:
+                del remaining[name]
+                continue
+            seconds, peak = benchmark(module, puzzle)
+            print(f"{characters:>5} {len(symbols):>7}  {name:<10} {seconds:>9.4f}s {peak / 1024:>8.0f}KB  {models(symbols)}")
+            if seconds > time_limit:
+                del remaining[name]
+
+
+if __name__ == "__main__":
+    main()
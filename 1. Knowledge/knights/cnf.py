@@ -0,0 +1,205 @@
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+# Number of symbols whose truth values are enumerated together, one model per bit of a Python int
+BLOCK_SYMBOLS = 16
+
+
+class CNF():
+    """
+    Clausal form of logical sentences over integer variables.
+
+    Sentences are compiled with the Tseitin transformation: every And, Or
+    and Biconditional gets an auxiliary variable that is constrained to
+    equal it, so the clauses grow linearly with the sentence. Literals
+    are non-zero integers in DIMACS style: variable v is the literal v,
+    and its negation is -v.
+    """
+
+    def __init__(self):
+        # Symbol name -> variable, and the symbol variables in order of creation
+        self.variables = {}
+        self.symbol_variables = []
+        self.names = {}
+
+        # List of clauses, each a list of literals at least one of which must be true
+        self.clauses = []
+
+        # Definitions of the auxiliary variables, in the order they were created:
+        # (variable, operator, literals) where operator is "and", "or" or "iff"
+        self.gates = []
+
+        # Compiled sentence -> literal, so repeated subsentences share a variable
+        self.literals = {}
+
+        self.variable_count = 0
+
+    def new_variable(self):
+        self.variable_count += 1
+        return self.variable_count
+
+    def symbol(self, name):
+        """Returns the variable for the symbol with the given name."""
+        if name not in self.variables:
+            variable = self.new_variable()
+            self.variables[name] = variable
+            self.names[variable] = name
+            self.symbol_variables.append(variable)
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses requiring the sentence to be true."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            # The conjuncts of a top-level And can be required one by one, without a variable for the And
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when the sentence is true."""
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            literal = self.gate("and", [self.literal(c) for c in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            literal = self.gate("or", [self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            literal = self.gate("or", [-self.literal(sentence.antecedent),
+                                       self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            literal = self.gate("iff", [self.literal(sentence.left),
+                                        self.literal(sentence.right)])
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+        self.literals[sentence] = literal
+        return literal
+
+    def gate(self, operator, literals):
+        """Returns a new variable constrained to equal operator applied to literals."""
+        g = self.new_variable()
+        self.gates.append((g, operator, literals))
+        if operator == "and":
+            # g => each literal, and all literals => g
+            for literal in literals:
+                self.clauses.append([-g, literal])
+            self.clauses.append([g] + [-literal for literal in literals])
+        elif operator == "or":
+            # each literal => g, and g => some literal
+            for literal in literals:
+                self.clauses.append([g, -literal])
+            self.clauses.append([-g] + literals)
+        else:
+            a, b = literals
+            self.clauses.extend([[-g, -a, b], [-g, a, -b], [g, a, b], [g, -a, -b]])
+        return g
+
+    def evaluate_block(self, columns, mask):
+        """
+        Evaluates the clauses for many models at once.
+
+        columns maps each symbol variable to an int whose bits are that
+        symbol's truth value in each model; mask has a bit set for each
+        model. Fills in the auxiliary variables' columns from their
+        definitions, and returns an int with a bit set for each model that
+        satisfies every clause.
+        """
+        def value(literal):
+            column = columns[abs(literal)]
+            return column if literal > 0 else ~column & mask
+
+        for g, operator, literals in self.gates:
+            if operator == "and":
+                column = mask
+                for literal in literals:
+                    column &= value(literal)
+            elif operator == "or":
+                column = 0
+                for literal in literals:
+                    column |= value(literal)
+            else:
+                a, b = literals
+                column = ~(value(a) ^ value(b)) & mask
+            columns[g] = column
+
+        satisfied = mask
+        for clause in self.clauses:
+            column = 0
+            for literal in clause:
+                column |= value(literal)
+            satisfied &= column
+            if not satisfied:
+                break
+        return satisfied
+
+    def blocks(self):
+        """
+        Yields (columns, mask) pairs that together cover every assignment
+        of truth values to the symbols, up to 2 ** BLOCK_SYMBOLS models at a time.
+        """
+        inner = self.symbol_variables[:BLOCK_SYMBOLS]
+        outer = self.symbol_variables[BLOCK_SYMBOLS:]
+        width = 1 << len(inner)
+        mask = (1 << width) - 1
+
+        # Bit m of inner symbol i's column is bit i of m, so the columns list every assignment once
+        base = {}
+        for i, variable in enumerate(inner):
+            period = 1 << (i + 1)
+            repeat = mask // ((1 << period) - 1)
+            base[variable] = repeat * (((1 << (period // 2)) - 1) << (period // 2))
+
+        for assignment in range(1 << len(outer)):
+            columns = dict(base)
+            for i, variable in enumerate(outer):
+                columns[variable] = mask if assignment >> i & 1 else 0
+            yield columns, mask
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, using the compiled clauses."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    query_literal = cnf.literal(query)
+
+    # Knowledge entails query if no model satisfies the knowledge but not the query
+    for columns, mask in cnf.blocks():
+        models = cnf.evaluate_block(columns, mask)
+        if models:
+            query_column = columns[abs(query_literal)]
+            if query_literal < 0:
+                query_column = ~query_column & mask
+            if models & ~query_column & mask:
+                return False
+    return True
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks which of the queries the knowledge base entails, evaluating
+    the knowledge base's clauses only once per block of models.
+
+    Returns a list of booleans, one per query.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    query_literals = [cnf.literal(query) for query in queries]
+
+    entailed = [True] * len(query_literals)
+    for columns, mask in cnf.blocks():
+        models = cnf.evaluate_block(columns, mask)
+        if not models:
+            continue
+        for i, literal in enumerate(query_literals):
+            column = columns[abs(literal)]
+            if literal < 0:
+                column = ~column & mask
+            if models & ~column & mask:
+                entailed[i] = False
+    return entailed
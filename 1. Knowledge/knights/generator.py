@@ -0,0 +1,143 @@
+import random
+import string
+import sys
+
+from cnf import CNF
+from logic import *
+from sat import Solver
+
+
+def character_names(count):
+    """Returns count names: A to Z, then A1, B1, ..."""
+    letters = string.ascii_uppercase
+    return [letters[i % 26] + (str(i // 26) if i >= 26 else "") for i in range(count)]
+
+
+class Puzzle():
+    """
+    A knights and knaves puzzle: knights always tell the truth, knaves always lie.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.knight = {name: Symbol(f"{name} is a Knight") for name in names}
+        self.knave = {name: Symbol(f"{name} is a Knave") for name in names}
+        self.statements = [] # (speaker, claim) pairs
+        self.knowledge = And()
+        for name in names:
+            # Information about the structure of the problem
+            self.knowledge.add(Or(self.knight[name], self.knave[name]))
+            self.knowledge.add(Not(And(self.knight[name], self.knave[name])))
+
+    def say(self, speaker, claim):
+        """Adds a statement: the speaker's claim is true exactly when the speaker is a knight."""
+        self.statements.append((speaker, claim))
+        self.knowledge.add(Biconditional(self.knight[speaker], claim))
+
+    def symbols(self):
+        """Returns every symbol of the puzzle, knight before knave for each character."""
+        return [symbol for name in self.names for symbol in (self.knight[name], self.knave[name])]
+
+
+def random_claim(puzzle, rng):
+    """Returns a random claim about one or two characters."""
+    x, y = rng.sample(puzzle.names, 2) if len(puzzle.names) > 1 else puzzle.names * 2
+    kind = rng.randrange(5)
+    if kind == 0:
+        return puzzle.knight[x]
+    elif kind == 1:
+        return puzzle.knave[x]
+    elif kind == 2: # "We are the same kind"
+        return Or(And(puzzle.knight[x], puzzle.knight[y]), And(puzzle.knave[x], puzzle.knave[y]))
+    elif kind == 3: # "At least one of us is a knave"
+        return Or(puzzle.knave[x], puzzle.knave[y])
+    else: # "Both are knights"
+        return And(puzzle.knight[x], puzzle.knight[y])
+
+
+def truth(claim, solution, puzzle):
+    """Returns whether a claim holds when the characters are as in solution (name -> is a knight)."""
+    model = {}
+    for name in puzzle.names:
+        model[puzzle.knight[name].name] = solution[name]
+        model[puzzle.knave[name].name] = not solution[name]
+    return claim.evaluate(model)
+
+
+def other_solution(puzzle):
+    """
+    Returns a second solution (name -> is a knight) to the puzzle besides
+    its intended one, or None if the intended solution is the only one.
+    """
+    cnf = CNF()
+    cnf.add(puzzle.knowledge)
+    solver = Solver(cnf.variable_count, cnf.clauses)
+
+    # Rule out the intended solution, and see if anything else is left
+    solver.add_clause([
+        -cnf.literal(puzzle.knight[name]) if puzzle.solution[name] else cnf.literal(puzzle.knight[name])
+        for name in puzzle.names
+    ])
+    model = solver.solve()
+    if model is None:
+        return None
+    return {name: model[cnf.literal(puzzle.knight[name])] for name in puzzle.names}
+
+
+def generate(characters, statements, seed=None, attempts=100):
+    """
+    Returns a random Puzzle with the given numbers of characters and
+    statements, whose knowledge base has exactly one solution; the
+    solution is available as puzzle.solution (name -> is a knight).
+
+    Raises ValueError if no such puzzle turns up within attempts tries,
+    e.g. because there are too few statements to pin everybody down.
+    """
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        puzzle = Puzzle(character_names(characters))
+        puzzle.solution = {name: rng.random() < 0.5 for name in puzzle.names}
+
+        alternative = other_solution(puzzle)
+        for _ in range(statements):
+            speaker = rng.choice(puzzle.names)
+
+            # Of a few random claims, prefer one that tells the intended solution apart from another solution
+            candidates = [random_claim(puzzle, rng) for _ in range(8)]
+            claim = candidates[0]
+            if alternative is not None:
+                for candidate in candidates:
+                    if truth(candidate, puzzle.solution, puzzle) != truth(candidate, alternative, puzzle):
+                        claim = candidate
+                        break
+
+            # A knight's claim must be true and a knave's false, so negate it if it doesn't fit the speaker
+            if truth(claim, puzzle.solution, puzzle) != puzzle.solution[speaker]:
+                claim = Not(claim)
+            puzzle.say(speaker, claim)
+
+            if alternative is not None and truth(Biconditional(puzzle.knight[speaker], claim), alternative, puzzle) is False:
+                alternative = other_solution(puzzle)
+
+        if alternative is None and other_solution(puzzle) is None:
+            return puzzle
+    raise ValueError(f"no puzzle with a unique solution found for {characters} characters and {statements} statements")
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python generator.py characters statements [seed]")
+    characters = int(sys.argv[1])
+    statements = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    puzzle = generate(characters, statements, seed)
+    for speaker, claim in puzzle.statements:
+        print(f'{speaker} says "{claim.formula()}"')
+    print("Solution:")
+    for name in puzzle.names:
+        print(f"    {name} is a {'Knight' if puzzle.solution[name] else 'Knave'}")
+
+
+if __name__ == "__main__":
+    main()
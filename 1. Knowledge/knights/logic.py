@@ -1,8 +1,19 @@
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Caches filled in on first use, plus whether the sentence is an interned (shared, immutable) node.
+    # Only interned nodes keep their caches, since any other sentence may contain an And that is added to later
+    __slots__ = ("_hash", "_symbols", "_formula", "_interned", "__weakref__")
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+        self._formula = None
+        self._interned = False
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +24,11 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns a cached frozenset of all symbols in the logical sentence."""
+        return frozenset()
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +58,19 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -65,12 +84,17 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset((self.name,))
+        return self._symbols
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
@@ -78,7 +102,12 @@ class Not(Sentence):
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is not None:
+            return self._hash
+        value = hash(("not", hash(self.operand)))
+        if self._interned:
+            self._hash = value
+        return value
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -87,14 +116,22 @@ class Not(Sentence):
         return not self.operand.evaluate(model)
 
     def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+        if self._formula is not None:
+            return self._formula
+        value = "¬" + Sentence.parenthesize(self.operand.formula())
+        if self._interned:
+            self._formula = value
+        return value
 
-    def symbols(self):
-        return self.operand.symbols()
+    def symbol_set(self):
+        return self.operand.symbol_set()
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
@@ -103,9 +140,14 @@ class And(Sentence):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        value = hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
+        if self._interned:
+            self._hash = value
+        return value
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,23 +157,39 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self._interned:
+            raise TypeError("cannot add to an interned sentence")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+            value = self.conjuncts[0].formula()
+        else:
+            value = " ∧ ".join([Sentence.parenthesize(conjunct.formula())
+                                for conjunct in self.conjuncts])
+        if self._interned:
+            self._formula = value
+        return value
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def symbol_set(self):
+        if self._symbols is not None:
+            return self._symbols
+        value = frozenset().union(*[conjunct.symbol_set() for conjunct in self.conjuncts])
+        if self._interned:
+            self._symbols = value
+        return value
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
@@ -140,9 +198,14 @@ class Or(Sentence):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        value = hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
+        if self._interned:
+            self._hash = value
+        return value
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -152,17 +215,31 @@ class Or(Sentence):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+            value = self.disjuncts[0].formula()
+        else:
+            value = " ∨  ".join([Sentence.parenthesize(disjunct.formula())
+                                 for disjunct in self.disjuncts])
+        if self._interned:
+            self._formula = value
+        return value
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def symbol_set(self):
+        if self._symbols is not None:
+            return self._symbols
+        value = frozenset().union(*[disjunct.symbol_set() for disjunct in self.disjuncts])
+        if self._interned:
+            self._symbols = value
+        return value
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
@@ -174,7 +251,12 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is not None:
+            return self._hash
+        value = hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._interned:
+            self._hash = value
+        return value
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -184,16 +266,29 @@ class Implication(Sentence):
                 or self.consequent.evaluate(model))
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+        value = f"{antecedent} => {consequent}"
+        if self._interned:
+            self._formula = value
+        return value
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def symbol_set(self):
+        if self._symbols is not None:
+            return self._symbols
+        value = self.antecedent.symbol_set() | self.consequent.symbol_set()
+        if self._interned:
+            self._symbols = value
+        return value
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
@@ -205,7 +300,12 @@ class Biconditional(Sentence):
                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is not None:
+            return self._hash
+        value = hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._interned:
+            self._hash = value
+        return value
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -217,12 +317,66 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
-
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+        value = f"{left} <=> {right}"
+        if self._interned:
+            self._formula = value
+        return value
+
+    def symbol_set(self):
+        if self._symbols is not None:
+            return self._symbols
+        value = self.left.symbol_set() | self.right.symbol_set()
+        if self._interned:
+            self._symbols = value
+        return value
+
+
+# Maps the structure of each interned sentence to its shared node, for as long as the node is in use
+# Children are interned first, so a node's structure can refer to them by identity
+interned = weakref.WeakValueDictionary()
+
+
+def intern(sentence):
+    """
+    Returns the single shared node for sentences structurally identical to
+    this one, interning its subsentences too, so that identical subtrees
+    are stored once and their hash, symbols and formula computed once.
+
+    Interned sentences must not be modified: And.add raises TypeError on them.
+    """
+    Sentence.validate(sentence)
+    if sentence._interned:
+        return sentence
+
+    if isinstance(sentence, Symbol):
+        key = (Symbol, sentence.name)
+        node = interned.get(key) or Symbol(sentence.name)
+    elif isinstance(sentence, Not):
+        operand = intern(sentence.operand)
+        key = (Not, id(operand))
+        node = interned.get(key) or Not(operand)
+    elif isinstance(sentence, (And, Or)):
+        children = [intern(child) for child in
+                    (sentence.conjuncts if isinstance(sentence, And) else sentence.disjuncts)]
+        key = (type(sentence), tuple(id(child) for child in children))
+        node = interned.get(key) or type(sentence)(*children)
+    elif isinstance(sentence, (Implication, Biconditional)):
+        first, second = ((sentence.antecedent, sentence.consequent) if isinstance(sentence, Implication)
+                         else (sentence.left, sentence.right))
+        first = intern(first)
+        second = intern(second)
+        key = (type(sentence), id(first), id(second))
+        node = interned.get(key) or type(sentence)(first, second)
+    else:
+        raise TypeError(f"cannot intern {type(sentence).__name__}")
+
+    node._interned = True
+    interned[key] = node
+    return node
 
 
 def model_check(knowledge, query):
@@ -261,3 +415,33 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks which of the queries the knowledge base entails, enumerating
+    the models of the knowledge base only once.
+
+    Returns a list of booleans, one per query.
+    """
+    queries = list(queries)
+    symbols = sorted(set.union(knowledge.symbols(),
+                               *[query.symbols() for query in queries]))
+
+    # Queries not yet seen to be false in some model of the knowledge base
+    entailed = [True] * len(queries)
+    remaining = list(range(len(queries)))
+
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        if not remaining:
+            break
+        model = dict(zip(symbols, values))
+
+        # Every query must be true in every model where the knowledge base is true
+        if knowledge.evaluate(model):
+            for i in remaining:
+                if not queries[i].evaluate(model):
+                    entailed[i] = False
+            remaining = [i for i in remaining if entailed[i]]
+
+    return entailed
@@ -88,8 +88,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            # Check every symbol against one enumeration of the knowledge base's models
+            for symbol, entailed in zip(symbols, model_check_all(knowledge, symbols)):
+                if entailed:
                     print(f"    {symbol}")
 
 
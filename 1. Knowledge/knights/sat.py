@@ -0,0 +1,336 @@
+from cnf import CNF
+
+# Conflicts before the first restart; later restarts follow the Luby sequence in multiples of this
+RESTART_BASE = 100
+ACTIVITY_DECAY = 0.95
+
+# Totals over every solver, for measuring how much work the solver does
+statistics = {"solves": 0, "conflicts": 0, "decisions": 0}
+
+
+class Solver():
+    """
+    CDCL satisfiability solver over DIMACS-style clauses (lists of non-zero
+    integer literals, where -v is the negation of variable v).
+
+    Uses two watched literals per clause for unit propagation, learns a
+    first-UIP clause from every conflict and jumps back to the level where
+    it becomes unit, picks decision variables by conflict activity, and
+    restarts on the Luby sequence. Clauses learned in one call to solve are
+    kept for the next, so the same solver can answer many queries under
+    different assumptions.
+    """
+
+    def __init__(self, variable_count, clauses=()):
+        self.variable_count = variable_count
+        self.clauses = []
+        self.watches = {}
+        for variable in range(1, variable_count + 1):
+            self.watches[variable] = []
+            self.watches[-variable] = []
+
+        # Per-variable state, indexed by variable
+        self.values = [None] * (variable_count + 1)
+        self.levels = [0] * (variable_count + 1)
+        self.reasons = [None] * (variable_count + 1)
+        self.activity = [0.0] * (variable_count + 1)
+        self.phase = [False] * (variable_count + 1)
+        self.increment = 1.0
+
+        self.trail = [] # Assigned literals in the order they were assigned
+        self.trail_limits = [] # Where each decision level starts in the trail
+        self.propagated = 0 # How much of the trail has been propagated
+        self.inconsistent = False
+        self.conflicts = 0
+        self.decisions = 0
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        """Returns True or False for an assigned literal, None otherwise."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, clause):
+        """Adds a clause; only allowed while no decisions have been made."""
+        clause = list(dict.fromkeys(clause)) # Drop repeated literals
+        if any(-literal in clause for literal in clause):
+            return # Always true
+        clause = [literal for literal in clause if self.value(literal) is not False]
+        if any(self.value(literal) for literal in clause):
+            return
+
+        if not clause:
+            self.inconsistent = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """Stores a clause of two or more literals, watching its first two."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses.
+        Returns the index of a clause with all its literals false, or None.
+        """
+        while self.propagated < len(self.trail):
+            false_literal = -self.trail[self.propagated]
+            self.propagated += 1
+
+            watching = self.watches[false_literal]
+            kept = []
+            conflict = None
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the false literal in the second slot
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Look for another literal to watch instead
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        conflict = index
+                        kept.extend(watching[position + 1:])
+                        break
+                    self.assign(clause[0], index)
+
+            self.watches[false_literal] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, level to jump back to) for a conflict,
+        where the learned clause's first literal is the first unique
+        implication point and becomes unit after the jump.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0 # Literals at the conflict level still to be resolved away
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back along the trail to the next literal to resolve on
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the highest remaining level second, so the clause is unit after the jump
+        highest = max(range(1, len(learned)), key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+
+    def backtrack(self, level):
+        """Undoes every assignment made above the given decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.propagated = len(self.trail)
+
+    def pick_branch(self):
+        """Returns the next decision literal, or None if every variable is assigned."""
+        best = None
+        best_activity = -1.0
+        for variable in range(1, self.variable_count + 1):
+            if self.values[variable] is None and self.activity[variable] > best_activity:
+                best = variable
+                best_activity = self.activity[variable]
+        if best is None:
+            return None
+        return best if self.phase[best] else -best
+
+    def solve(self, assumptions=()):
+        """
+        Searches for an assignment satisfying every clause with all the
+        assumption literals true.
+
+        Returns a dict mapping each variable to True or False, or None if
+        there is no such assignment.
+        """
+        statistics["solves"] += 1
+        if self.inconsistent:
+            return None
+
+        restart = 0
+        conflicts_until_restart = RESTART_BASE * luby(restart)
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    statistics["conflicts"] += 1
+                    if not self.trail_limits:
+                        self.inconsistent = True
+                        return None
+
+                    learned, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learned) == 1:
+                        self.assign(learned[0], None)
+                    else:
+                        self.assign(learned[0], self.attach(learned))
+                    self.increment /= ACTIVITY_DECAY
+
+                    conflicts_until_restart -= 1
+                    if conflicts_until_restart == 0:
+                        restart += 1
+                        conflicts_until_restart = RESTART_BASE * luby(restart)
+                        self.backtrack(0)
+                    continue
+
+                # Assumptions are the first decisions, one per level
+                level = len(self.trail_limits)
+                if level < len(assumptions):
+                    literal = assumptions[level]
+                    if self.value(literal) is False:
+                        return None
+                    self.trail_limits.append(len(self.trail))
+                    if self.value(literal) is None:
+                        self.assign(literal, None)
+                    continue
+
+                literal = self.pick_branch()
+                if literal is None:
+                    return {variable: self.values[variable] for variable in range(1, self.variable_count + 1)}
+                self.decisions += 1
+                statistics["decisions"] += 1
+                self.trail_limits.append(len(self.trail))
+                self.assign(literal, None)
+        finally:
+            self.backtrack(0)
+
+
+def luby(i):
+    """Returns the i-th number (counting from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size = 1
+    while size < i + 1:
+        size = 2 * size + 1
+    while size - 1 != i:
+        size //= 2
+        i %= size
+    return (size + 1) // 2
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, by showing knowledge ∧ ¬query is unsatisfiable."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    query_literal = cnf.literal(query)
+    solver = Solver(cnf.variable_count, cnf.clauses)
+    return solver.solve([-query_literal]) is None
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks which of the queries the knowledge base entails, with one
+    solver for the knowledge base.
+
+    Every model the solver finds rules out all the queries that are false
+    in it at once, so only the entailed queries (the backbone) and one
+    query per distinct model cost a call to the solver.
+
+    Returns a list of booleans, one per query.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    query_literals = [cnf.literal(query) for query in queries]
+    solver = Solver(cnf.variable_count, cnf.clauses)
+
+    def true_in(model, literal):
+        return model[abs(literal)] == (literal > 0)
+
+    entailed = [True] * len(query_literals)
+    model = solver.solve()
+    if model is None:
+        return entailed # An inconsistent knowledge base entails everything
+
+    candidates = []
+    for i, literal in enumerate(query_literals):
+        if true_in(model, literal):
+            candidates.append(i)
+        else:
+            entailed[i] = False
+
+    while candidates:
+        i = candidates.pop()
+        model = solver.solve([-query_literals[i]])
+        if model is None:
+            continue # No model of the knowledge base makes the query false
+
+        entailed[i] = False
+        remaining = []
+        for j in candidates:
+            if true_in(model, query_literals[j]):
+                remaining.append(j)
+            else:
+                entailed[j] = False
+        candidates = remaining
+    return entailed
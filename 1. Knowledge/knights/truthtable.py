@@ -0,0 +1,138 @@
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+# Beyond this many symbols the truth table no longer comfortably fits in memory
+# (a column is 2 ** 26 bits, 8 MB, so the symbols alone take over 200 MB)
+MAX_SYMBOLS = 26
+
+# Models are packed 64 to a word, so the first 6 symbols vary within each word
+WORD_BITS = 64
+ALL = np.uint64(2 ** 64 - 1)
+
+# Word in which bit b is bit i of b, for each of the first 6 symbols
+PATTERNS = [
+    np.uint64(sum(1 << b for b in range(WORD_BITS) if b >> i & 1))
+    for i in range(6)
+]
+
+
+def word_count(symbol_count):
+    """Returns the number of words a column of the truth table takes."""
+    return max(1, (1 << symbol_count) // WORD_BITS)
+
+
+def truth_table(symbols):
+    """
+    Returns a dict mapping each symbol name to an array of uint64 words
+    holding its truth value in every one of the 2 ** len(symbols) models,
+    bit-packed: model m is bit m % 64 of word m // 64, and gives the i-th
+    symbol the value of bit i of m. (With fewer than 6 symbols the single
+    word repeats the models, which doesn't change what is entailed.)
+    """
+    symbols = list(symbols)
+    if len(symbols) > MAX_SYMBOLS:
+        raise ValueError(f"too many symbols for a truth table ({len(symbols)} > {MAX_SYMBOLS})")
+    words = np.arange(word_count(len(symbols)), dtype=np.uint64)
+    table = {}
+    for i, symbol in enumerate(symbols):
+        if i < 6:
+            table[symbol] = np.full(len(words), PATTERNS[i], dtype=np.uint64)
+        else:
+            table[symbol] = np.where(words >> np.uint64(i - 6) & np.uint64(1), ALL, np.uint64(0))
+    return table
+
+
+def repeated_subsentences(*sentences):
+    """
+    Returns the set of subsentences (other than symbols) that occur more
+    than once across the sentences, which are the ones worth caching.
+    """
+    seen = set()
+    repeated = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            continue
+        if sentence in seen:
+            repeated.add(sentence)
+            continue
+        seen.add(sentence)
+        if isinstance(sentence, Not):
+            stack.append(sentence.operand)
+        elif isinstance(sentence, And):
+            stack.extend(sentence.conjuncts)
+        elif isinstance(sentence, Or):
+            stack.extend(sentence.disjuncts)
+        elif isinstance(sentence, Implication):
+            stack.extend((sentence.antecedent, sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            stack.extend((sentence.left, sentence.right))
+    return repeated
+
+
+def evaluate(sentence, table, cache=None, shared=None):
+    """
+    Evaluates the logical sentence in every model of the truth table at once,
+    returning a bit-packed array of words. Subsentences in shared (by default,
+    every subsentence) are kept in cache so they are only evaluated once; the
+    columns of the rest are freed as soon as they have been used.
+    """
+    if cache is None:
+        cache = {}
+    if sentence in cache:
+        return cache[sentence]
+
+    if isinstance(sentence, Symbol):
+        try:
+            return table[sentence.name]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    elif isinstance(sentence, Not):
+        value = ~evaluate(sentence.operand, table, cache, shared)
+    elif isinstance(sentence, And):
+        value = np.full(word_count(len(table)), ALL, dtype=np.uint64)
+        for conjunct in sentence.conjuncts:
+            value &= evaluate(conjunct, table, cache, shared)
+    elif isinstance(sentence, Or):
+        value = np.zeros(word_count(len(table)), dtype=np.uint64)
+        for disjunct in sentence.disjuncts:
+            value |= evaluate(disjunct, table, cache, shared)
+    elif isinstance(sentence, Implication):
+        value = ~evaluate(sentence.antecedent, table, cache, shared)
+        value |= evaluate(sentence.consequent, table, cache, shared)
+    elif isinstance(sentence, Biconditional):
+        value = evaluate(sentence.left, table, cache, shared) ^ evaluate(sentence.right, table, cache, shared)
+        np.invert(value, out=value)
+    else:
+        raise Exception("nothing to evaluate")
+
+    if shared is None or sentence in shared:
+        cache[sentence] = value
+    return value
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query, over the whole truth table at once."""
+    return model_check_all(knowledge, [query])[0]
+
+
+def model_check_all(knowledge, queries):
+    """
+    Checks which of the queries the knowledge base entails.
+    Returns a list of booleans, one per query.
+    """
+    Sentence.validate(knowledge)
+    queries = list(queries)
+    symbols = sorted(knowledge.symbols().union(*[query.symbols() for query in queries]))
+    table = truth_table(symbols)
+    shared = repeated_subsentences(knowledge, *queries)
+    cache = {}
+
+    # Query is entailed if it is true wherever the knowledge base is true
+    models = evaluate(knowledge, table, cache, shared)
+    return [
+        not np.any(models & ~evaluate(query, table, cache, shared))
+        for query in queries
+    ]